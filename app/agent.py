@@ -878,10 +878,16 @@ class HoneypotAgent:
             return "hi"
         return "en"
     
+    def reset_session(self, session_id: str) -> None:
+        """Forget the conversation context for a session."""
+        self.session_context.pop(session_id, None)
+    
     def _get_context(self, session_id: str) -> dict:
         """Get or create context for a session."""
-        if session_id not in self.session_context:
-            self.session_context[session_id] = {
+        # One lookup on the hit path (every call after the first turn)
+        context = self.session_context.get(session_id)
+        if context is None:
+            context = self.session_context[session_id] = {
                 "responses_given": [],
                 "detected_tactics": set(),
                 "conversation_history": [],
@@ -896,29 +902,44 @@ class HoneypotAgent:
                 "threat_count": 0,  # Number of actual threat messages received
                 "greeting_stage": False,  # True if last interaction was greeting-only
             }
-        return self.session_context[session_id]
+        return context
     
-    def process_conversation_history(self, session_id: str, history: list) -> None:
+    def process_conversation_history(self, session_id: str, history: list) -> List[str]:
         """
         Process conversation history to build context awareness.
         
         Only processes NEW messages since last call to avoid duplicate
         history accumulation across multiple requests.
+        
+        Returns the new scammer texts seen in this pass, so the caller can
+        score them without walking the history a second time. This is the
+        only walk over the request history: the detector and extractor
+        consume the returned texts (never the full list).
         """
         context = self._get_context(session_id)
-        
-        # Only process messages we haven't seen yet
-        already_processed = context.get("_history_processed_count", 0)
-        new_messages = history[already_processed:]
-        
-        for msg in new_messages:
+        turns = context["conversation_history"]
+        detected_tactics = context["detected_tactics"]
+        
+        # Only process messages we haven't seen yet. The common case is a
+        # client resending the same history, which returns right away.
+        already_processed = context["_history_processed_count"]
+        history_len = len(history)
+        if history_len == already_processed:
+            return []
+        new_scammer_texts = []
+        
+        # Indexed from the processed count: neither copies the tail nor
+        # steps through the already-seen prefix (islice would)
+        for i in range(already_processed, history_len):
+            msg = history[i]
             sender = getattr(msg, 'sender', None) or msg.get('sender', 'scammer')
             text = getattr(msg, 'text', None) or msg.get('text', '')
             
             if sender == "scammer":
+                new_scammer_texts.append(text)
                 tactics = self._detect_tactics(text)
-                context["detected_tactics"].update(tactics)
-                context["conversation_history"].append({"role": "scammer", "text": text})
+                detected_tactics.update(tactics)
+                turns.append({"role": "scammer", "text": text})
                 
                 # Update escalation level based on tactics
                 if "threat" in tactics or "digital_arrest" in tactics:
@@ -928,12 +949,14 @@ class HoneypotAgent:
                 elif tactics:
                     context["escalation_level"] = max(context["escalation_level"], 1)
             elif sender == "agent":
-                context["conversation_history"].append({"role": "agent", "text": text})
+                turns.append({"role": "agent", "text": text})
                 # Check if we've asked for details
-                if any(phrase in text.lower() for phrase in ["upi", "account number", "number should i send"]):
+                lowered = text.lower()
+                if any(phrase in lowered for phrase in ("upi", "account number", "number should i send")):
                     context["intel_requested"] = True
         
-        context["_history_processed_count"] = len(history)
+        context["_history_processed_count"] = history_len
+        return new_scammer_texts
     
     def _detect_tactics(self, message: str) -> List[str]:
         """Figure out what scam tactics they're using (English + Hindi)."""
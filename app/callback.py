@@ -5,22 +5,65 @@ When the honeypot gathers enough evidence on a confirmed scam, this module
 automatically submits the extracted intelligence to the configured
 government reporting endpoint.
 """
-import requests
 import os
-import json
+import asyncio
+import threading
+from typing import Optional
 from datetime import datetime
 from dotenv import load_dotenv
 import logging
+import orjson
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# httpx for async callback POSTs over a pooled keep-alive connection
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+    logger.warning("httpx not installed. Callbacks will be recorded but not sent.")
+
 # Government portal endpoint where we submit scam intelligence
 CALLBACK_URL = os.getenv("CALLBACK_URL", "")
 
 # File to store callback history for debugging/audit
 CALLBACK_LOG_FILE = "callback_history.json"
+# _log_callback runs in worker threads; its read-append-write of the file
+# must not interleave or records are lost / the JSON is truncated
+_log_file_lock = threading.Lock()
+
+CALLBACK_TIMEOUT_SECONDS = 10
+# Callbacks are minutes apart; httpx's default 5s idle expiry would drop
+# the pooled connection (and its TLS session) between almost every pair
+CALLBACK_KEEPALIVE_SECONDS = 300
+
+# Shared client: reuses the TCP/TLS connection across callbacks
+_client: Optional["httpx.AsyncClient"] = None
+
+
+def _get_client() -> "httpx.AsyncClient":
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=CALLBACK_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_keepalive_connections=64,
+                keepalive_expiry=CALLBACK_KEEPALIVE_SECONDS,
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+    return _client
+
+
+async def close_client():
+    """Close the pooled callback client on shutdown."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
 
 
 def _log_callback(session_id: str, payload: dict, response_status: int, response_text: str, success: bool):
@@ -35,26 +78,28 @@ def _log_callback(session_id: str, payload: dict, response_status: int, response
     }
     
     # IMPORTANT: Log to stdout for Railway logs (always visible)
-    logger.info(f"📞 CALLBACK RECORD: {json.dumps(callback_record, indent=None)}")
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"📞 CALLBACK RECORD: {orjson.dumps(callback_record).decode()}")
     
     try:
         # Also save to local file (works locally, not on Railway)
-        if os.path.exists(CALLBACK_LOG_FILE):
-            with open(CALLBACK_LOG_FILE, "r") as f:
-                logs = json.load(f)
-        else:
-            logs = []
-        
-        logs.append(callback_record)
-        
-        with open(CALLBACK_LOG_FILE, "w") as f:
-            json.dump(logs, f, indent=2)
+        with _log_file_lock:
+            if os.path.exists(CALLBACK_LOG_FILE):
+                with open(CALLBACK_LOG_FILE, "rb") as f:
+                    logs = orjson.loads(f.read())
+            else:
+                logs = []
+            
+            logs.append(callback_record)
+            
+            with open(CALLBACK_LOG_FILE, "wb") as f:
+                f.write(orjson.dumps(logs, option=orjson.OPT_INDENT_2))
             
     except Exception as e:
         logger.warning(f"Failed to log callback to file: {e}")
 
 
-def send_final_callback(
+async def send_final_callback(
     session_id: str,
     total_messages: int,
     intelligence: dict,
@@ -89,48 +134,45 @@ def send_final_callback(
     }
     
     # If no endpoint is configured, record the payload but skip the HTTP call
-    if not CALLBACK_URL:
+    if not CALLBACK_URL or not HTTPX_AVAILABLE:
         logger.info(f"📋 CALLBACK RECORDED (no endpoint configured) for session {session_id}")
-        logger.info(f"📋 CALLBACK PAYLOAD: {json.dumps(payload, ensure_ascii=False)[:800]}")
-        _log_callback(session_id, payload, 0, "No CALLBACK_URL configured", False)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"📋 CALLBACK PAYLOAD: {orjson.dumps(payload).decode()[:800]}")
+        await asyncio.to_thread(_log_callback, session_id, payload, 0, "No CALLBACK_URL configured", False)
         return "no_endpoint", payload
     
     try:
         logger.info(f"🚀 SENDING CALLBACK for session {session_id} to {CALLBACK_URL}")
-        logger.info(f"🚀 CALLBACK PAYLOAD: {json.dumps(payload, ensure_ascii=False)[:800]}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"🚀 CALLBACK PAYLOAD: {orjson.dumps(payload).decode()[:800]}")
         
-        response = requests.post(
-            CALLBACK_URL,
-            json=payload,
-            timeout=10,
-            headers={"Content-Type": "application/json"}
-        )
+        response = await _get_client().post(CALLBACK_URL, json=payload)
         
         # 200, 201, 204 all mean success
         if response.status_code in [200, 201, 204]:
             logger.info(f"Callback accepted for session {session_id}")
-            _log_callback(session_id, payload, response.status_code, response.text, True)
-            return "sent", payload
+            status, success = "sent", True
         else:
             logger.error(f"Callback rejected: {response.status_code} - {response.text}")
-            _log_callback(session_id, payload, response.status_code, response.text, False)
-            return "failed", payload
+            status, success = "failed", False
+        await asyncio.to_thread(_log_callback, session_id, payload, response.status_code, response.text, success)
+        return status, payload
             
-    except requests.exceptions.Timeout:
-        logger.error("Callback timed out after 10 seconds")
-        _log_callback(session_id, payload, 0, "Timeout after 10 seconds", False)
+    except httpx.TimeoutException:
+        logger.error(f"Callback timed out after {CALLBACK_TIMEOUT_SECONDS} seconds")
+        await asyncio.to_thread(_log_callback, session_id, payload, 0, f"Timeout after {CALLBACK_TIMEOUT_SECONDS} seconds", False)
         return "failed", payload
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Network error sending callback: {str(e)}")
-        _log_callback(session_id, payload, 0, f"Network error: {str(e)}", False)
+        await asyncio.to_thread(_log_callback, session_id, payload, 0, f"Network error: {str(e)}", False)
         return "failed", payload
     except Exception as e:
         logger.error(f"Unexpected error in callback: {str(e)}")
-        _log_callback(session_id, payload, 0, f"Unexpected error: {str(e)}", False)
+        await asyncio.to_thread(_log_callback, session_id, payload, 0, f"Unexpected error: {str(e)}", False)
         return "failed", payload
 
 
-def should_send_callback(scam_detected: bool, total_messages: int, intelligence: dict) -> bool:
+def should_send_callback(scam_detected: bool, total_messages: int, intel_counts: dict) -> bool:
     """
     Check if conditions are met to send the callback.
     
@@ -141,25 +183,32 @@ def should_send_callback(scam_detected: bool, total_messages: int, intelligence:
        — keywords alone are NOT enough for law enforcement
     
     This is the FINAL step of the conversation lifecycle.
+    
+    intel_counts is the per-type count dict (extractor.IntelCounts.as_dict())
+    the caller already built for the response and DB summary.
     """
-    bank_ct = len(intelligence.get("bankAccounts", []))
-    upi_ct = len(intelligence.get("upiIds", []))
-    link_ct = len(intelligence.get("phishingLinks", []))
-    phone_ct = len(intelligence.get("phoneNumbers", []))
-    email_ct = len(intelligence.get("emails", []))
-    keyword_ct = len(intelligence.get("suspiciousKeywords", []))
+    bank_ct = intel_counts.get("bankAccounts", 0)
+    upi_ct = intel_counts.get("upiIds", 0)
+    link_ct = intel_counts.get("phishingLinks", 0)
+    phone_ct = intel_counts.get("phoneNumbers", 0)
+    email_ct = intel_counts.get("emails", 0)
+    keyword_ct = intel_counts.get("suspiciousKeywords", 0)
     has_intel = any([bank_ct > 0, upi_ct > 0, link_ct > 0, phone_ct > 0, email_ct > 0])
     
     eligible = scam_detected and total_messages >= 3 and has_intel
     
-    # Always log eligibility for debugging deployed issues
-    logger.info(
-        f"📋 CALLBACK ELIGIBILITY: eligible={eligible} | "
-        f"scam_detected={scam_detected}, total_messages={total_messages}(need>=3), "
-        f"has_intel={has_intel} [bank={bank_ct}, upi={upi_ct}, links={link_ct}, phone={phone_ct}, email={email_ct}], "
-        f"keywords={keyword_ct}"
-    )
-    if not eligible:
+    # Most turns are not eligible: the full breakdown is logged for those
+    # only at DEBUG, so the common path builds no log strings at all
+    verbose = logger.isEnabledFor(logging.DEBUG)
+    if eligible or verbose:
+        logger.log(
+            logging.INFO if eligible else logging.DEBUG,
+            f"📋 CALLBACK ELIGIBILITY: eligible={eligible} | "
+            f"scam_detected={scam_detected}, total_messages={total_messages}(need>=3), "
+            f"has_intel={has_intel} [bank={bank_ct}, upi={upi_ct}, links={link_ct}, phone={phone_ct}, email={email_ct}], "
+            f"keywords={keyword_ct}"
+        )
+    if not eligible and verbose:
         reasons = []
         if not scam_detected:
             reasons.append("scam NOT confirmed")
@@ -167,6 +216,6 @@ def should_send_callback(scam_detected: bool, total_messages: int, intelligence:
             reasons.append(f"only {total_messages} messages (need 3+)")
         if not has_intel:
             reasons.append("NO actionable identifiers extracted (need at least one: UPI/bank/phone/link/email)")
-        logger.warning(f"⚠️ CALLBACK NOT ELIGIBLE: {', '.join(reasons)}")
+        logger.debug(f"⚠️ CALLBACK NOT ELIGIBLE: {', '.join(reasons)}")
     
     return eligible
@@ -5,9 +5,11 @@ PRIVACY: We store ONLY session summaries, NOT raw chat messages.
 No OTPs, credentials, or personal identities are persisted.
 """
 import os
+import asyncio
 import logging
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +86,7 @@ class DatabaseService:
         callback_sent: bool = False,
         intelligence: dict = None,
         fraud_type: str = "GENERIC SCAM",
+        llm_cache_hit: bool = False,
     ):
         """Persist a session summary with intelligence data."""
         if not self.enabled:
@@ -101,6 +104,7 @@ class DatabaseService:
                 "intelligenceTypes": intelligence_counts,
                 "tactics": tactics,
                 "responseMode": response_mode,
+                "llmCacheHit": llm_cache_hit,  # reply served from the LLM reply cache/pool
                 "callbackSent": callback_sent,
                 "timestamp": datetime.now(timezone.utc),
             }
@@ -123,14 +127,23 @@ class DatabaseService:
         except Exception as e:
             logger.error(f"Failed to save session summary: {e}")
     
-    def get_session_summaries(self, limit: int = 50) -> List[dict]:
-        """Get recent session summaries for UI."""
+    # Fields the /sessions list renders (skips the stored intelligence bodies)
+    SESSION_LIST_FIELDS = (
+        "sessionId", "scamType", "riskLevel", "confidence", "messageCount", "scamDetected",
+        "intelligenceTypes", "callbackSent", "responseMode", "tactics", "timestamp",
+    )
+    
+    def get_session_summaries(self, limit: int = 50, fields: Optional[tuple] = None) -> List[dict]:
+        """Get recent session summaries for UI (only `fields`, when given)."""
         if not self.enabled:
             return []
+        projection = {"_id": 0}
+        if fields:
+            projection.update(dict.fromkeys(fields, 1))
         try:
             cursor = self.db.session_summaries.find(
                 {},
-                {"_id": 0}
+                projection
             ).sort("timestamp", DESCENDING).limit(limit)
             return list(cursor)
         except Exception as e:
@@ -150,6 +163,20 @@ class DatabaseService:
             logger.error(f"Failed to fetch session: {e}")
             return None
     
+    def get_scam_types_bulk(self, session_ids: List[str]) -> Dict[str, str]:
+        """Map sessionId -> scamType for many sessions in one query."""
+        if not self.enabled or not session_ids:
+            return {}
+        try:
+            cursor = self.db.session_summaries.find(
+                {"sessionId": {"$in": list(set(session_ids))}},
+                {"_id": 0, "sessionId": 1, "scamType": 1}
+            )
+            return {doc["sessionId"]: doc.get("scamType", "unknown") for doc in cursor}
+        except Exception as e:
+            logger.error(f"Failed to fetch session scam types: {e}")
+            return {}
+    
     # ── Callback Records ───────────────────────────────────────────────
     
     def save_callback_record(
@@ -269,5 +296,94 @@ class DatabaseService:
         }
 
 
+@dataclass
+class DBWrite:
+    """A deferred DatabaseService write."""
+    kind: str      # "summary" | "callback"
+    payload: dict  # keyword arguments for the save_* method
+
+
+class DBWriteQueue:
+    """
+    Bounded background queue for session summary / callback writes.
+    
+    /honeypot enqueues and returns; a single worker drains up to
+    BATCH_SIZE writes at a time and runs them in a thread so blocking
+    pymongo calls never hold the event loop. One worker keeps writes for
+    a session in order. With MAX_SIZE writes pending, new summary writes
+    are dropped (the next turn re-sends the session's summary); callback
+    records are one per session and are always queued.
+    """
+    
+    MAX_SIZE = 1024
+    BATCH_SIZE = 32
+    
+    def __init__(self, service: DatabaseService):
+        self.service = service
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.on_write: Optional[Callable[[], None]] = None  # called after each write batch
+    
+    def start(self):
+        """Spawn the writer task (call from the app's startup hook)."""
+        if self._task is None:
+            self._queue = asyncio.Queue()  # put() caps summaries at MAX_SIZE
+            self._task = asyncio.create_task(self._run())
+    
+    def put(self, kind: str, **payload):
+        """Enqueue a write without waiting for the database."""
+        write = DBWrite(kind=kind, payload=payload)
+        if self._queue is None or not self.service.enabled:
+            # Not started (or nothing to write to): keep the old inline path
+            self._write_batch([write])
+            return
+        if kind == "summary" and self._queue.qsize() >= self.MAX_SIZE:
+            self.dropped += 1
+            logger.warning(f"DB write queue full: dropped summary write ({self.dropped} total)")
+            return
+        self._queue.put_nowait(write)
+    
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.BATCH_SIZE and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _write_batch(self, batch: List[DBWrite]):
+        for write in batch:
+            self._write(write)
+        # One notification per batch: readers only need to know data changed
+        if self.on_write is not None:
+            self.on_write()
+    
+    def _write(self, write: DBWrite):
+        try:
+            if write.kind == "summary":
+                self.service.save_session_summary(**write.payload)
+            elif write.kind == "callback":
+                self.service.save_callback_record(**write.payload)
+        except Exception as e:
+            logger.error(f"Deferred DB write failed ({write.kind}): {e}")
+    
+    async def stop(self, timeout: float = 5.0):
+        """Flush pending writes, then cancel the worker."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"DB write queue flush timed out ({self._queue.qsize()} pending)")
+        self._task.cancel()
+        self._task = None
+        self._queue = None
+
+
 # Singleton
 db_service = DatabaseService()
+db_writer = DBWriteQueue(db_service)
@@ -15,7 +15,9 @@ This multi-layered approach catches sophisticated scammers who try to
 avoid obvious keywords while still exhibiting scam behavior patterns.
 """
 import re
-from typing import Tuple, Dict, List, Set
+import math
+from bisect import bisect_right
+from typing import Tuple, Dict, List, Set, FrozenSet
 from dataclasses import dataclass, field
 from intent_classifier import classify_intent
 
@@ -29,7 +31,11 @@ class DetectionResult:
     risk_level: str = "low"  # low, medium, high, critical
     scam_type: str = "unknown"
     detected_patterns: List[str] = field(default_factory=list)
-    triggered_categories: Set[str] = field(default_factory=set)
+    triggered_categories: FrozenSet[str] = frozenset()
+
+
+# Shared result for sessions that have not been scored yet (read-only)
+_EMPTY_RESULT = DetectionResult(risk_level="minimal")
 
 
 class ScamDetector:
@@ -344,6 +350,36 @@ class ScamDetector:
         5: 70,   # 5+ categories hit = +70
     }
     
+    # LAYER 1 keyword dictionaries and the category each one feeds
+    KEYWORD_LAYERS = (
+        (URGENCY_KEYWORDS, "urgency"),
+        (VERIFICATION_KEYWORDS, "verification"),
+        (PAYMENT_KEYWORDS, "payment"),
+        (THREAT_KEYWORDS, "threat"),
+        (GOVT_IMPERSONATION, "govt_impersonation"),
+        (IDENTITY_SCAM, "identity_scam"),
+        (TELECOM_SCAM, "telecom_scam"),
+        (COURIER_SCAM, "courier_scam"),
+        (JOB_LOAN_SCAM, "job_loan_scam"),
+    )
+    
+    # Compiled once at import: whole-word keyword regexes per layer, the
+    # templates, and every link pattern folded into one alternation
+    KEYWORD_REGEXES = tuple(
+        (tuple((re.compile(r'\b' + re.escape(keyword) + r'\b'), weight)
+               for keyword, weight in keyword_dict.items()), category)
+        for keyword_dict, category in KEYWORD_LAYERS
+    )
+    TEMPLATE_REGEXES = tuple(
+        (re.compile(pattern, re.IGNORECASE), pattern, weight, ptype)
+        for pattern, weight, ptype in SCAM_TEMPLATES
+    )
+    LINK_REGEX = re.compile("|".join(LINK_PATTERNS))
+    
+    # Joins history texts for one-scan keyword matching. A non-word char,
+    # so \b boundaries at the joins are unchanged and no keyword spans one.
+    BULK_SEPARATOR = "\x1e"
+    
     def __init__(self):
         self.session_scores: Dict[str, int] = {}
         self.session_details: Dict[str, DetectionResult] = {}
@@ -351,16 +387,14 @@ class ScamDetector:
         self.session_message_count: Dict[str, int] = {}
         self.session_intents: Dict[str, List[dict]] = {}  # v2.2: intent history per session
     
-    def _check_keywords(self, text: str, keyword_dict: dict, category: str, 
+    def _check_keywords(self, text_lower: str, keyword_regexes: tuple, category: str, 
                         categories: set) -> int:
         """Check keywords using word boundary matching to avoid false positives."""
         score = 0
-        text_lower = text.lower()
-        for keyword, weight in keyword_dict.items():
-            # Use word boundary regex to match whole words only
-            # This prevents "know" from matching "now", "need" from matching "ed"
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, text_lower):
+        # Word boundary regexes match whole words only
+        # This prevents "know" from matching "now", "need" from matching "ed"
+        for regex, weight in keyword_regexes:
+            if regex.search(text_lower):
                 score += weight
                 categories.add(category)
         return score
@@ -372,8 +406,8 @@ class ScamDetector:
         scam_type = "unknown"
         text_lower = text.lower()
         
-        for pattern, weight, ptype in self.SCAM_TEMPLATES:
-            if re.search(pattern, text_lower, re.IGNORECASE):
+        for regex, pattern, weight, ptype in self.TEMPLATE_REGEXES:
+            if regex.search(text_lower):
                 score += weight
                 matches.append(pattern)
                 if scam_type == "unknown":
@@ -383,10 +417,7 @@ class ScamDetector:
     
     def _check_links(self, text: str) -> int:
         """Check for suspicious links."""
-        for pattern in self.LINK_PATTERNS:
-            if re.search(pattern, text.lower()):
-                return 15
-        return 0
+        return 15 if self.LINK_REGEX.search(text.lower()) else 0
     
     def _check_escalation(self, text: str) -> int:
         """Check for escalation signals."""
@@ -405,8 +436,6 @@ class ScamDetector:
         Uses a logarithmic curve so confidence grows meaningfully with evidence
         but doesn't immediately pin at 0.99 after a few messages.
         """
-        import math
-        
         if score < self.SCAM_THRESHOLD:
             # Below scam threshold: linear ramp from 0 to 0.5
             return round(min(score / self.SCAM_THRESHOLD * 0.5, 0.49), 2)
@@ -455,6 +484,18 @@ class ScamDetector:
         Returns:
             (cumulative_score, is_scam) - total score so far and whether it's a scam
         """
+        categories = self._start_message(session_id)
+        
+        # LAYER 1: Keyword scoring
+        keyword_score = 0
+        text_lower = text.lower()
+        for keyword_regexes, category in self.KEYWORD_REGEXES:
+            keyword_score += self._check_keywords(text_lower, keyword_regexes, category, categories)
+        
+        return self._score_message(text, session_id, keyword_score)
+    
+    def _start_message(self, session_id: str) -> Set[str]:
+        """Count a new message for the session; return its category set."""
         # Initialize session tracking
         if session_id not in self.session_categories:
             self.session_categories[session_id] = set()
@@ -462,31 +503,19 @@ class ScamDetector:
             self.session_intents[session_id] = []
         
         self.session_message_count[session_id] += 1
+        return self.session_categories[session_id]
+    
+    def _score_message(self, text: str, session_id: str, keyword_score: int) -> Tuple[int, bool]:
+        """Layers 2-5 plus session bookkeeping, given the message's keyword score."""
         categories = self.session_categories[session_id]
-        message_score = 0
+        message_score = keyword_score
         
-        # v2.2: Intent classification (runs before keyword scoring)
+        # v2.2: Intent classification
         intent_result = classify_intent(text)
         self.session_intents.setdefault(session_id, []).append(intent_result)
         intent_risk = intent_result.get("risk_increment", 0)
         message_score += intent_risk
         
-        # LAYER 1: Keyword scoring
-        all_keyword_dicts = [
-            (self.URGENCY_KEYWORDS, "urgency"),
-            (self.VERIFICATION_KEYWORDS, "verification"),
-            (self.PAYMENT_KEYWORDS, "payment"),
-            (self.THREAT_KEYWORDS, "threat"),
-            (self.GOVT_IMPERSONATION, "govt_impersonation"),
-            (self.IDENTITY_SCAM, "identity_scam"),
-            (self.TELECOM_SCAM, "telecom_scam"),
-            (self.COURIER_SCAM, "courier_scam"),
-            (self.JOB_LOAN_SCAM, "job_loan_scam"),
-        ]
-        
-        for keyword_dict, category in all_keyword_dicts:
-            message_score += self._check_keywords(text, keyword_dict, category, categories)
-        
         # LAYER 2: Pattern combination analysis
         pattern_score, pattern_matches, scam_type = self._check_patterns(text)
         message_score += pattern_score
@@ -535,7 +564,7 @@ class ScamDetector:
             risk_level=risk_level,
             scam_type=inferred_type,
             detected_patterns=pattern_matches,
-            triggered_categories=categories.copy()
+            triggered_categories=frozenset(categories)
         )
         
         return total_score, is_scam
@@ -568,20 +597,64 @@ class ScamDetector:
                 return "generic_scam"
             return "unknown"
     
+    def calculate_risk_score_bulk(self, texts: List[str], session_id: str) -> Tuple[int, bool]:
+        """
+        Score a batch of messages (e.g. unseen conversation history).
+        
+        Layer 1 (keywords) runs as one scan per keyword over all texts
+        joined, with matches assigned back to messages by offset. The other
+        layers are cumulative per message (multi-category bonus, intent
+        history, message count), so they still run one text at a time, in
+        order. Results are identical to calling calculate_risk_score on
+        each text. Returns the (cumulative_score, is_scam) after the last.
+        """
+        result = (self.get_session_score(session_id), False)
+        if not texts:
+            return result
+        keyword_scores, keyword_categories = self._keyword_scores_bulk(texts)
+        for text, keyword_score, message_categories in zip(texts, keyword_scores, keyword_categories):
+            self._start_message(session_id).update(message_categories)
+            result = self._score_message(text, session_id, keyword_score)
+        return result
+    
+    def _keyword_scores_bulk(self, texts: List[str]) -> Tuple[List[int], List[Set[str]]]:
+        """Per-text keyword score and categories, from one scan of the joined texts."""
+        # Lowercase per text: offsets must come from the lowered strings
+        # (lower() can change length, e.g. "İ")
+        lowered = [text.lower() for text in texts]
+        joined = self.BULK_SEPARATOR.join(lowered)
+        starts = []
+        pos = 0
+        for text in lowered:
+            starts.append(pos)
+            pos += len(text) + len(self.BULK_SEPARATOR)
+        scores = [0] * len(texts)
+        categories: List[Set[str]] = [set() for _ in texts]
+        for keyword_regexes, category in self.KEYWORD_REGEXES:
+            for regex, weight in keyword_regexes:
+                last = -1  # a keyword counts once per message, like re.search
+                for match in regex.finditer(joined):
+                    i = bisect_right(starts, match.start()) - 1
+                    if i != last:
+                        scores[i] += weight
+                        categories[i].add(category)
+                        last = i
+        return scores, categories
+    
     def get_session_score(self, session_id: str) -> int:
         """Get the current risk score for a session."""
         return self.session_scores.get(session_id, 0)
     
     def get_detection_details(self, session_id: str) -> DetectionResult:
         """Get detailed detection result for a session."""
-        return self.session_details.get(session_id, DetectionResult())
+        return self.session_details.get(session_id, _EMPTY_RESULT)
     
     def get_session_intents(self, session_id: str) -> List[dict]:
         """Get intent classification history for a session (v2.2)."""
         return self.session_intents.get(session_id, [])
     
     def reset_session(self, session_id: str) -> None:
-        """Clear score for a session (useful for testing)."""
+        """Clear all scoring state for a session (evicted sessions, tests)."""
         if session_id in self.session_scores:
             del self.session_scores[session_id]
         if session_id in self.session_details:
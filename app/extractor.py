@@ -19,7 +19,44 @@ We only extract what the scammer voluntarily shares.
 We never ask for OTPs, passwords, or other sensitive info.
 """
 import re
-from typing import Dict, Set, List
+from dataclasses import dataclass
+from typing import Dict, Set, List, TypedDict
+
+
+class IntelCountsDict(TypedDict):
+    """Dict shape of IntelCounts as stored in DB summaries and API responses."""
+    upiIds: int
+    phoneNumbers: int
+    bankAccounts: int
+    phishingLinks: int
+    emails: int
+    suspiciousKeywords: int
+
+
+@dataclass(slots=True)
+class IntelCounts:
+    """Item counts per intelligence type, shared by API response and DB summary."""
+    upiIds: int = 0
+    phoneNumbers: int = 0
+    bankAccounts: int = 0
+    phishingLinks: int = 0
+    emails: int = 0
+    suspiciousKeywords: int = 0
+    
+    @classmethod
+    def from_intelligence(cls, intelligence: dict) -> "IntelCounts":
+        return cls(*(len(intelligence.get(field, ())) for field in cls.__slots__))
+    
+    def as_dict(self) -> IntelCountsDict:
+        # Literal, not a getattr loop over __slots__: one dict build, no lookups
+        return {
+            "upiIds": self.upiIds,
+            "phoneNumbers": self.phoneNumbers,
+            "bankAccounts": self.bankAccounts,
+            "phishingLinks": self.phishingLinks,
+            "emails": self.emails,
+            "suspiciousKeywords": self.suspiciousKeywords,
+        }
 
 
 class IntelligenceExtractor:
@@ -131,7 +168,7 @@ class IntelligenceExtractor:
     
     WHATSAPP_PATTERN = r'(?:whatsapp|wa)[\s:]*\+?[0-9]{10,13}'
     TELEGRAM_PATTERN = r'(?:telegram|tg)[\s:@]*[a-zA-Z0-9_]{5,32}'
-    
+
     # =========================================================================
     # SUSPICIOUS KEYWORDS (Enhanced list)
     # =========================================================================
@@ -181,6 +218,10 @@ class IntelligenceExtractor:
     def __init__(self):
         self.session_data: Dict[str, Dict[str, Set]] = {}
     
+    def reset_session(self, session_id: str) -> None:
+        """Forget the intelligence collected for a session."""
+        self.session_data.pop(session_id, None)
+    
     def _init_session(self, session_id: str) -> None:
         """Initialize storage for a new session."""
         if session_id not in self.session_data:
@@ -220,7 +261,25 @@ class IntelligenceExtractor:
         Items accumulate across the session.
         """
         self._init_session(session_id)
+        self._scan_text(text, self.session_data[session_id])
+        return self.snapshot(session_id)
+    
+    def extract_bulk(self, texts: List[str], session_id: str) -> dict:
+        """
+        Extract intelligence from several messages, returning one snapshot.
+        
+        Each text is scanned on its own: _scan_text has whole-text rules
+        (a known-handle UPI promotes every x@y token in the same text), so
+        joining messages would let one message's match leak into another.
+        """
+        self._init_session(session_id)
         data = self.session_data[session_id]
+        for text in texts:
+            self._scan_text(text, data)
+        return self.snapshot(session_id)
+    
+    def _scan_text(self, text: str, data: dict):
+        """Run every extraction pattern over text, adding hits to data."""
         text_lower = text.lower()
         
         # -----------------------------------------------------------------
@@ -339,7 +398,16 @@ class IntelligenceExtractor:
             pattern = r'\b' + re.escape(keyword) + r'\b'
             if re.search(pattern, text_lower):
                 data["suspiciousKeywords"].add(keyword)
+    
+    def snapshot(self, session_id: str) -> dict:
+        """
+        Return accumulated session intel as lists without scanning any text.
         
+        Used when the current message was already extracted (e.g. a client
+        resend), so there is nothing new to find.
+        """
+        self._init_session(session_id)
+        data = self.session_data[session_id]
         # Return current session intel as lists (main fields for API response)
         return {
             "bankAccounts": list(data["bankAccounts"]),
@@ -376,7 +444,7 @@ class IntelligenceExtractor:
             return {}
         
         data = self.session_data[session_id]
-        return {k: len(v) for k, v in data.items() if len(v) > 0}
+        return {k: n for k, v in data.items() if (n := len(v)) > 0}
     
     def get_all_identifiers(self, session_id: str) -> List[str]:
         """Get all extracted identifiers as a flat list for reporting."""
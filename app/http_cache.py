@@ -0,0 +1,59 @@
+"""
+Short-TTL response cache for dashboard read endpoints.
+
+The UI polls /sessions, /patterns and /callbacks every 1-2 seconds while
+the underlying data only changes when /honeypot writes. Results are kept
+for TTL_SECONDS and dropped early when invalidate() bumps the version
+(called after each /honeypot write). If the database call fails and an
+older value exists, the stale value is served rather than an error.
+Misses run the (blocking pymongo) compute function in the worker pool.
+"""
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Versioned TTL + LRU cache keyed by (route, params)."""
+
+    TTL_SECONDS = 2.0
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires, version, value)
+        self.version = 0
+
+    def invalidate(self) -> None:
+        """Mark every cached value as outdated (new data was written)."""
+        self.version += 1
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return a fresh cached value for key, or compute (off the loop) and store it."""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now and entry[1] == self.version:
+            self._entries.move_to_end(key)
+            return entry[2]
+        version = self.version
+        try:
+            value = await asyncio.to_thread(compute)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"Serving stale cache for {key}: {e}")
+            return entry[2]
+        # Tag with the version seen before computing: a write that lands
+        # meanwhile leaves this entry outdated rather than marked fresh
+        self._entries[key] = (now + self.TTL_SECONDS, version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.MAX_ENTRIES:
+            self._entries.popitem(last=False)
+        return value
+
+
+# Singleton instance
+response_cache = ResponseCache()
@@ -0,0 +1,30 @@
+"""
+In-flight call sharing - identical concurrent calls await one result.
+
+The first caller for a key starts the call; callers with the same key that
+arrive while it is running await that call instead of starting their own.
+Nothing waits on a timer, and the entry is removed as soon as the call
+finishes. Used in front of the LLM so identical concurrent prompts share
+one API call.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class InFlight:
+    """Running calls by key; a caller with a running key joins that call."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await call(), or the call already running under the same key."""
+        future = self._calls.get(key)
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(call())
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        # Shielded: one cancelled caller must not cancel the shared call
+        return await asyncio.shield(future)
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -11,7 +11,15 @@ import hashlib
 import re
 import logging
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from detector import detector as _det
+
+try:
+    from pymongo import DESCENDING, UpdateOne
+except ImportError:
+    DESCENDING = -1  # same value; the registry is disabled without pymongo anyway
+    UpdateOne = None
 
 logger = logging.getLogger(__name__)
 
@@ -65,6 +73,18 @@ def get_fraud_color(fraud_type: str) -> str:
     return FRAUD_TYPE_COLORS.get(fraud_type, "slate")
 
 
+# scam_type -> (fraud label, badge color), resolved once at import
+_FRAUD_BADGES = {
+    scam_type: (label, get_fraud_color(label)) for scam_type, label in FRAUD_TYPE_MAP.items()
+}
+_DEFAULT_BADGE = ("GENERIC SCAM", get_fraud_color("GENERIC SCAM"))
+
+
+def fraud_badge(scam_type: str) -> Tuple[str, str]:
+    """(fraud label, badge color) for a scam_type in a single lookup."""
+    return _FRAUD_BADGES.get(scam_type, _DEFAULT_BADGE)
+
+
 # ── Identifier type detection ──────────────────────────────────────────────
 
 def _detect_identifier_type(value: str) -> str:
@@ -100,15 +120,23 @@ def mask_identifier(value: str, id_type: str | None = None) -> str:
 
 # ── Pattern Fingerprint ───────────────────────────────────────────────────
 
-def generate_pattern_hash(scam_type: str, tactics: List[str], identifiers: List[str]) -> str:
+# Intelligence fields whose values feed the pattern fingerprint
+PATTERN_IDENTIFIER_FIELDS = ("upiIds", "phoneNumbers", "bankAccounts", "phishingLinks", "emails")
+
+
+def generate_pattern_hash(scam_type: str, tactics: List[str], identifiers: Iterable[str]) -> str:
     """
     Generate a pattern fingerprint from session characteristics.
     Used for correlating similar scam patterns across sessions.
     """
+    return _pattern_hash(scam_type, tactics, {_detect_identifier_type(i) for i in identifiers})
+
+
+def _pattern_hash(scam_type: str, tactics: List[str], identifier_types: Set[str]) -> str:
     components = [
         scam_type or "unknown",
         "|".join(sorted(set(tactics))) if tactics else "",
-        "|".join(sorted(set(_detect_identifier_type(i) for i in identifiers))) if identifiers else "",
+        "|".join(sorted(identifier_types)),
     ]
     raw = "::".join(components).lower()
     return hashlib.sha256(raw.encode()).hexdigest()[:16]
@@ -139,6 +167,15 @@ def compute_similarity_score(hash_a: str, hash_b: str, type_a: str, type_b: str,
 
 # ── Detection Reasoning Generator ─────────────────────────────────────────
 
+# Tactic substrings -> reason, in the order the reasons are listed
+_TACTIC_REASONS = (
+    (("urgency", "urgent", "pressure"), "Urgency pattern detected"),
+    (("payment", "transfer", "upi"), "Payment redirection attempt"),
+    (("threat", "arrest", "legal"), "Threat/intimidation tactics used"),
+    (("kyc", "verify", "aadhaar"), "Identity verification scam pattern"),
+)
+
+
 def generate_detection_reasoning(
     scam_type: str,
     risk_level: str,
@@ -156,16 +193,14 @@ def generate_detection_reasoning(
     v2.2: Only generates full reasoning when risk_score >= REASONING_THRESHOLD (40).
     Below threshold, returns a minimal "monitoring" verdict.
     """
-    from detector import detector as _det
-    
-    fraud_label = classify_fraud_type(scam_type)
+    fraud_label, fraud_color = fraud_badge(scam_type)
     
     # v2.2: Below reasoning threshold → return minimal info
     if risk_score < _det.REASONING_THRESHOLD:
         return {
             "verdict": "MONITORING — No scam indicators confirmed",
             "fraud_type": fraud_label,
-            "fraud_color": get_fraud_color(fraud_label),
+            "fraud_color": fraud_color,
             "risk_level": risk_level,
             "confidence": confidence,
             "similarity_score": 0.0,
@@ -176,20 +211,11 @@ def generate_detection_reasoning(
     
     reasons = []
 
-    # Analyze tactics for reasoning
-    urgency_tactics = [t for t in tactics if "urgency" in t.lower() or "urgent" in t.lower() or "pressure" in t.lower()]
-    payment_tactics = [t for t in tactics if "payment" in t.lower() or "transfer" in t.lower() or "upi" in t.lower()]
-    threat_tactics = [t for t in tactics if "threat" in t.lower() or "arrest" in t.lower() or "legal" in t.lower()]
-    identity_tactics = [t for t in tactics if "kyc" in t.lower() or "verify" in t.lower() or "aadhaar" in t.lower()]
-
-    if urgency_tactics:
-        reasons.append("Urgency pattern detected")
-    if payment_tactics:
-        reasons.append("Payment redirection attempt")
-    if threat_tactics:
-        reasons.append("Threat/intimidation tactics used")
-    if identity_tactics:
-        reasons.append("Identity verification scam pattern")
+    # Analyze tactics for reasoning (lowercased once, each check stops at the first hit)
+    lowered = [t.lower() for t in tactics]
+    for markers, reason in _TACTIC_REASONS:
+        if any(m in t for t in lowered for m in markers):
+            reasons.append(reason)
 
     # Intel-based reasoning
     total_intel = sum(intelligence_counts.values()) if intelligence_counts else 0
@@ -221,7 +247,7 @@ def generate_detection_reasoning(
     return {
         "verdict": verdict,
         "fraud_type": fraud_label,
-        "fraud_color": get_fraud_color(fraud_label),
+        "fraud_color": fraud_color,
         "risk_level": risk_level,
         "confidence": confidence,
         "similarity_score": similarity_score,
@@ -239,6 +265,15 @@ class IntelligenceRegistryService:
     Tracks unique identifiers across sessions with metadata.
     """
 
+    # Intelligence field -> registry identifier type
+    FIELD_TYPES = {
+        "upiIds": "UPI",
+        "phoneNumbers": "Phone",
+        "emails": "Email",
+        "bankAccounts": "Bank",
+        "phishingLinks": "Link",
+    }
+
     def __init__(self, db_service):
         self.db = db_service
 
@@ -301,18 +336,71 @@ class IntelligenceRegistryService:
         confidence: float,
     ):
         """Register all extracted intelligence from a session."""
-        type_map = {
-            "upiIds": "UPI",
-            "phoneNumbers": "Phone",
-            "emails": "Email",
-            "bankAccounts": "Bank",
-            "phishingLinks": "Link",
-        }
-        for field, id_type in type_map.items():
+        for field, id_type in self.FIELD_TYPES.items():
             for value in intelligence.get(field, []):
                 if value:
                     self.upsert_identifier(value, id_type, risk_level, confidence, session_id)
 
+    def register_session_intelligence_bulk(self, items: Iterable[dict]) -> int:
+        """
+        Register intelligence for many sessions with a single bulk_write.
+
+        items are dicts with session_id, intelligence, risk_level and
+        confidence. Repeats of a value are merged first, so each identifier
+        becomes one upsert. Returns the number of identifiers written.
+        """
+        coll = self._get_collection()
+        if coll is None:
+            return 0
+        merged: Dict[str, dict] = {}
+        for item in items:
+            session_id = item["session_id"]
+            risk_level = item["risk_level"]
+            confidence = item["confidence"]
+            intelligence = item["intelligence"]
+            for field, id_type in self.FIELD_TYPES.items():
+                for value in intelligence.get(field, []):
+                    if not value:
+                        continue
+                    entry = merged.get(value)
+                    if entry is None:
+                        merged[value] = {
+                            "type": id_type, "riskLevel": risk_level, "confidence": confidence,
+                            "occurrences": 1, "sessions": [session_id],
+                        }
+                        continue
+                    # Same outcome as sequential upserts: last risk wins, max confidence
+                    entry["riskLevel"] = risk_level
+                    entry["confidence"] = max(entry["confidence"], confidence)
+                    entry["occurrences"] += 1
+                    if session_id not in entry["sessions"]:
+                        entry["sessions"].append(session_id)
+        if not merged:
+            return 0
+        now = datetime.now(timezone.utc)
+        ops = [
+            UpdateOne(
+                {"value": value},
+                {"$set": {
+                    "riskLevel": e["riskLevel"],
+                    "lastSeen": now,
+                    "masked": mask_identifier(value, e["type"]),
+                },
+                "$max": {"confidence": e["confidence"]},
+                "$addToSet": {"sessions": {"$each": e["sessions"]}},
+                "$inc": {"occurrences": e["occurrences"]},
+                "$setOnInsert": {"type": e["type"], "firstSeen": now}},
+                upsert=True,
+            )
+            for value, e in merged.items()
+        ]
+        try:
+            coll.bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to bulk upsert identifiers: {e}")
+            return 0
+        return len(ops)
+
     def get_registry(self, id_type: str | None = None, risk_level: str | None = None,
                      limit: int = 100) -> List[dict]:
         """Fetch registry entries with optional filters."""
@@ -325,7 +413,6 @@ class IntelligenceRegistryService:
                 query["type"] = id_type
             if risk_level:
                 query["riskLevel"] = risk_level
-            from pymongo import DESCENDING
             cursor = coll.find(query, {"_id": 0}).sort("lastSeen", DESCENDING).limit(limit)
             results = []
             for doc in cursor:
@@ -393,15 +480,18 @@ class PatternCorrelationService:
         session_id: str,
         scam_type: str,
         tactics: List[str],
-        identifiers: List[str],
+        identifiers: Iterable[str],
         risk_level: str,
         confidence: float,
     ) -> dict:
         """
         Register a pattern for a session and find correlations.
         Returns correlation info: pattern_hash, match_count, similar_sessions.
+        identifiers may be any iterable; it is consumed once.
         """
-        pattern_hash = generate_pattern_hash(scam_type, tactics, identifiers)
+        # Typed once, shared by the fingerprint and the stored identifierTypes
+        identifier_types = {_detect_identifier_type(i) for i in identifiers}
+        pattern_hash = _pattern_hash(scam_type, tactics, identifier_types)
         coll = self._get_collection()
 
         result = {
@@ -450,7 +540,7 @@ class PatternCorrelationService:
                     "scamType": scam_type,
                     "fraudType": fraud_label,
                     "tactics": tactics,
-                    "identifierTypes": list(set(_detect_identifier_type(i) for i in identifiers)) if identifiers else [],
+                    "identifierTypes": list(identifier_types),
                     "riskLevel": risk_level,
                     "confidence": confidence,
                     "timestamp": now,
@@ -468,6 +558,48 @@ class PatternCorrelationService:
 
         return result
 
+    def register_pattern_bulk(self, items: Iterable[dict]) -> int:
+        """
+        Upsert pattern fingerprints for many sessions with a single bulk_write.
+
+        items are dicts with the register_pattern arguments. Unlike
+        register_pattern, no correlation lookup is done - callers that only
+        need the stored fingerprints (the backfill) skip two finds per session.
+        Returns the number of patterns written.
+        """
+        coll = self._get_collection()
+        if coll is None:
+            return 0
+        now = datetime.now(timezone.utc)
+        ops = []
+        for item in items:
+            scam_type = item["scam_type"]
+            tactics = item["tactics"]
+            identifier_types = {_detect_identifier_type(i) for i in item["identifiers"]}
+            ops.append(UpdateOne(
+                {"sessionId": item["session_id"]},
+                {"$set": {
+                    "sessionId": item["session_id"],
+                    "patternHash": _pattern_hash(scam_type, tactics, identifier_types),
+                    "scamType": scam_type,
+                    "fraudType": classify_fraud_type(scam_type),
+                    "tactics": tactics,
+                    "identifierTypes": list(identifier_types),
+                    "riskLevel": item["risk_level"],
+                    "confidence": item["confidence"],
+                    "timestamp": now,
+                }},
+                upsert=True,
+            ))
+        if not ops:
+            return 0
+        try:
+            coll.bulk_write(ops, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to bulk register patterns: {e}")
+            return 0
+        return len(ops)
+
     def get_pattern_stats(self) -> dict:
         """Get pattern frequency statistics."""
         coll = self._get_collection()
@@ -14,6 +14,7 @@ It NEVER:
 """
 import os
 import time
+import random
 import asyncio
 import logging
 from pathlib import Path
@@ -242,9 +243,14 @@ class LLMService:
             logger.warning("🤖 LLM service DISABLED: GROQ_API_KEY not set in environment variables")
             return
         try:
+            # Pool limits live on the transport (a client's own limits are
+            # ignored when a transport is given); keep idle Groq connections
+            # for 5 min instead of httpx's 5s so quiet spells don't cost a
+            # fresh TLS handshake
             transport = httpx.AsyncHTTPTransport(
                 retries=1,
                 local_address="0.0.0.0",
+                limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300),
             )
             self._client = httpx.AsyncClient(
                 transport=transport,
@@ -292,21 +298,19 @@ class LLMService:
             Input: "good morning"
             Output: ("Good morning ji! Kaun bol rahe ho?", "llm")
         """
-        import random as _random
-
         # If LLM service is disabled, use rule-based fallback immediately
         if not self.enabled:
             logger.warning("🤖 LLM SKIP (greeting): service not enabled")
-            return _random.choice(GREETING_FALLBACK_RESPONSES), "rule_based"
+            return random.choice(GREETING_FALLBACK_RESPONSES), "rule_based"
 
         # Circuit breaker check — if we've had too many failures, skip LLM temporarily
-        now = time.time()
+        now = time.monotonic()
         if now < self._backoff_until:
             logger.debug("LLM circuit breaker active during greeting, using fallback")
-            return _random.choice(GREETING_FALLBACK_RESPONSES), "rule_based_fallback"
+            return random.choice(GREETING_FALLBACK_RESPONSES), "rule_based_fallback"
 
         self._total_calls += 1
-        start_time = time.time()
+        start_time = time.monotonic()
 
         try:
             # Construct the prompt for the LLM
@@ -320,7 +324,7 @@ class LLMService:
                 timeout=self.timeout_ms / 1000.0
             )
 
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.monotonic() - start_time) * 1000
 
             # Validate the response — ensure it's not empty and passes safety checks
             if llm_reply and self._is_safe(llm_reply):
@@ -337,20 +341,20 @@ class LLMService:
                 # Response was unsafe or empty — fall back to rule-based greeting
                 self._record_failure("unsafe_or_empty_greeting")
                 logger.warning(f"LLM greeting reply unsafe or empty, falling back. elapsed={elapsed_ms:.0f}ms")
-                return _random.choice(GREETING_FALLBACK_RESPONSES), "rule_based_fallback"
+                return random.choice(GREETING_FALLBACK_RESPONSES), "rule_based_fallback"
 
         except asyncio.TimeoutError:
             # LLM took too long to respond — use fallback greeting
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.monotonic() - start_time) * 1000
             self._record_failure("timeout_greeting")
             logger.warning(f"LLM greeting timeout after {elapsed_ms:.0f}ms, falling back to greeting fallback")
-            return _random.choice(GREETING_FALLBACK_RESPONSES), "rule_based_fallback"
+            return random.choice(GREETING_FALLBACK_RESPONSES), "rule_based_fallback"
         except Exception as e:
             # Any other error — log and fall back to rule-based greeting
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.monotonic() - start_time) * 1000
             self._record_failure("error_greeting")
             logger.error(f"LLM greeting error after {elapsed_ms:.0f}ms: {e}")
-            return _random.choice(GREETING_FALLBACK_RESPONSES), "rule_based_fallback"
+            return random.choice(GREETING_FALLBACK_RESPONSES), "rule_based_fallback"
 
     async def rephrase_reply(
         self,
@@ -377,14 +381,14 @@ class LLMService:
             return rule_reply, "rule_based"
 
         # Circuit breaker: skip calls during backoff
-        now = time.time()
+        now = time.monotonic()
         if now < self._backoff_until:
             remaining = self._backoff_until - now
             logger.debug(f"LLM circuit breaker active, skipping call ({remaining:.0f}s remaining)")
             return rule_reply, "rule_based_fallback"
 
         self._total_calls += 1
-        start_time = time.time()
+        start_time = time.monotonic()
 
         try:
             # Build recent turns context for anti-repetition (v2.2)
@@ -411,7 +415,7 @@ class LLMService:
                 timeout=self.timeout_ms / 1000.0
             )
 
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.monotonic() - start_time) * 1000
 
             if llm_reply and self._is_safe(llm_reply):
                 self._consecutive_failures = 0
@@ -428,12 +432,12 @@ class LLMService:
                 return rule_reply, "rule_based_fallback"
 
         except asyncio.TimeoutError:
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.monotonic() - start_time) * 1000
             self._record_failure("timeout")
             logger.warning(f"LLM timeout after {elapsed_ms:.0f}ms, falling back to rule-based")
             return rule_reply, "rule_based_fallback"
         except Exception as e:
-            elapsed_ms = (time.time() - start_time) * 1000
+            elapsed_ms = (time.monotonic() - start_time) * 1000
             self._record_failure("error")
             logger.error(f"LLM error after {elapsed_ms:.0f}ms: {e}")
             return rule_reply, "rule_based_fallback"
@@ -444,7 +448,7 @@ class LLMService:
         self._total_fallbacks += 1
         if self._consecutive_failures >= self._max_consecutive_failures:
             backoff_seconds = min(60, 10 * (self._consecutive_failures // self._max_consecutive_failures))
-            self._backoff_until = time.time() + backoff_seconds
+            self._backoff_until = time.monotonic() + backoff_seconds
             logger.warning(
                 f"LLM circuit breaker activated: {self._consecutive_failures} consecutive failures "
                 f"(reason: {reason}), backing off for {backoff_seconds}s"
@@ -502,7 +506,7 @@ class LLMService:
                         retry_delay = int(float(retry_after))
                     except ValueError:
                         pass
-                self._backoff_until = time.time() + retry_delay
+                self._backoff_until = time.monotonic() + retry_delay
                 logger.warning(f"Groq rate limited (429), backing off for {retry_delay}s")
                 return None
 
@@ -561,7 +565,7 @@ class LLMService:
             "timeout_ms": self.timeout_ms,
             "httpx_installed": HTTPX_AVAILABLE,
             "api_key_set": bool(self.api_key),
-            "circuit_breaker": "active" if time.time() < self._backoff_until else "idle",
+            "circuit_breaker": "active" if time.monotonic() < self._backoff_until else "idle",
             "stats": {
                 "total_calls": self._total_calls,
                 "successes": self._total_successes,
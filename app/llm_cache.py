@@ -0,0 +1,223 @@
+"""
+LLM Reply Cache - skip the network round-trip for repeated scam scripts.
+
+Scammers reuse the same scripts across sessions, so the same
+(strategy, scammer message) pair shows up again and again. A successful
+LLM rephrase is cached in two tiers:
+
+1. Exact:      hash of (strategy, rule_reply, scammer_message)
+2. Normalized: hash of (strategy, rule_reply, normalized scammer_message),
+               where case, punctuation and spacing in the scammer message
+               are ignored so "Pay now!!" and "pay NOW" share an entry for
+               the same rule reply. Messages with digits or identifiers
+               (emails, UPI IDs, links) skip this tier: the reply may quote
+               them back, and a near-match would quote the wrong ones
+
+Greeting replies ("hi", "hello sir") are pooled instead: up to
+GREETING_POOL_SIZE distinct LLM greetings per normalized opener, after
+which one is picked at random, so repeat openers skip the LLM but
+sessions still get varied replies.
+
+Only real LLM output is cached - rule-based fallbacks never are, so the
+invariant in llm.py ("LLM enhances realism, NEVER correctness") holds.
+Hits keep the "llm" reply source and are flagged separately
+(llmCacheHit on the session summary).
+"""
+import re
+import time
+import random
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from llm import llm_service
+from inflight import InFlight
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r'[^\w\s]')
+_IDENTIFIERS = re.compile(r'\d|@|https?://|www\.', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+class ReplyCache:
+    """Two-tier LRU cache of LLM rephrased replies with a TTL."""
+
+    MAX_ENTRIES = 512
+    TTL_SECONDS = 3600
+
+    def __init__(self):
+        self._exact: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._normalized: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(*parts: str) -> str:
+        return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        text = _NON_WORD.sub(" ", text.lower())
+        return _SPACES.sub(" ", text).strip()
+
+    def _normalized_key(self, strategy: str, rule_reply: str, scammer_message: str) -> Optional[str]:
+        # Amounts, numbers and identifiers must be echoed exactly: exact tier only
+        if _IDENTIFIERS.search(scammer_message):
+            return None
+        return self._key(strategy, rule_reply, self._normalize(scammer_message))
+
+    def _lookup(self, store: OrderedDict, key: str) -> Optional[str]:
+        entry = store.get(key)
+        if entry is None:
+            return None
+        stored_at, reply = entry
+        if time.monotonic() - stored_at > self.TTL_SECONDS:
+            del store[key]
+            return None
+        store.move_to_end(key)
+        return reply
+
+    def _store(self, store: OrderedDict, key: str, reply: str) -> None:
+        store[key] = (time.monotonic(), reply)
+        store.move_to_end(key)
+        while len(store) > self.MAX_ENTRIES:
+            store.popitem(last=False)
+
+    def get(self, strategy: str, rule_reply: str, scammer_message: str) -> Optional[str]:
+        """Return a cached reply (exact tier first, then normalized tier)."""
+        reply = self._lookup(self._exact, self._key(strategy, rule_reply, scammer_message))
+        if reply is None:
+            key = self._normalized_key(strategy, rule_reply, scammer_message)
+            if key is not None:
+                reply = self._lookup(self._normalized, key)
+        if reply is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return reply
+
+    def put(self, strategy: str, rule_reply: str, scammer_message: str, reply: str) -> None:
+        """Store a successful LLM reply in both tiers (exact only for identifiers)."""
+        self._store(self._exact, self._key(strategy, rule_reply, scammer_message), reply)
+        key = self._normalized_key(strategy, rule_reply, scammer_message)
+        if key is not None:
+            self._store(self._normalized, key, reply)
+
+    def get_stats(self) -> dict:
+        return {
+            "entries": len(self._exact),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class GreetingPool:
+    """Per-opener pool of distinct LLM greeting replies, LRU + TTL bounded."""
+
+    POOL_SIZE = 4
+    MAX_ENTRIES = 256
+    TTL_SECONDS = 3600
+
+    def __init__(self):
+        self._pools: "OrderedDict[str, Tuple[float, list]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, scammer_message: str) -> str:
+        return ReplyCache._key(ReplyCache._normalize(scammer_message))
+
+    def pick(self, scammer_message: str) -> Optional[str]:
+        """Random pooled reply once the opener's pool is full, else None."""
+        key = self._key(scammer_message)
+        entry = self._pools.get(key)
+        if entry is not None and time.monotonic() - entry[0] > self.TTL_SECONDS:
+            del self._pools[key]
+            entry = None
+        if entry is None or len(entry[1]) < self.POOL_SIZE:
+            self.misses += 1
+            return None
+        self._pools.move_to_end(key)
+        self.hits += 1
+        return random.choice(entry[1])
+
+    def add(self, scammer_message: str, reply: str) -> None:
+        key = self._key(scammer_message)
+        entry = self._pools.get(key)
+        if entry is None:
+            entry = self._pools[key] = (time.monotonic(), [])
+        replies = entry[1]
+        if reply not in replies and len(replies) < self.POOL_SIZE:
+            replies.append(reply)
+        self._pools.move_to_end(key)
+        while len(self._pools) > self.MAX_ENTRIES:
+            self._pools.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        return {"entries": len(self._pools), "hits": self.hits, "misses": self.misses}
+
+
+# Singleton instances
+reply_cache = ReplyCache()
+greeting_pool = GreetingPool()
+# Identical concurrent rephrase prompts share one LLM call
+llm_inflight = InFlight()
+
+
+async def cached_rephrase(
+    strategy: str,
+    rule_reply: str,
+    scammer_message: str,
+    recent_turns: Optional[list] = None,
+) -> Tuple[str, str, bool]:
+    """
+    llm_service.rephrase_reply with caching.
+
+    Returns (reply, source, cache_hit). A cache hit keeps the "llm" source
+    (it is LLM output) and sets cache_hit so the summary records it.
+    A cached reply that already appears in recent_turns is skipped, so the
+    cache never defeats the LLM prompt's anti-repetition rule.
+    """
+    cached = reply_cache.get(strategy, rule_reply, scammer_message)
+    if cached is not None:
+        recent_texts = {t.get("text") for t in (recent_turns or []) if isinstance(t, dict)}
+        if cached not in recent_texts:
+            logger.debug("LLM cache hit for strategy=%s", strategy)
+            return cached, "llm", True
+
+    # The recent turns are part of the prompt, so they are part of the key:
+    # sessions with different histories never share a reply
+    turns_key = tuple((t.get("role"), t.get("text")) for t in recent_turns or ())
+    reply, source = await llm_inflight.run(
+        (strategy, rule_reply, scammer_message, turns_key),
+        lambda: llm_service.rephrase_reply(
+            strategy=strategy,
+            rule_reply=rule_reply,
+            scammer_message=scammer_message,
+            recent_turns=recent_turns,
+        ),
+    )
+    if source == "llm":
+        reply_cache.put(strategy, rule_reply, scammer_message, reply)
+    return reply, source, False
+
+
+async def batched_greeting(scammer_message: str) -> Tuple[str, str, bool]:
+    """
+    llm_service.generate_greeting_reply with pooling.
+
+    Returns (reply, source, cache_hit), like cached_rephrase.
+
+    Served from the greeting pool once it is full; otherwise each session
+    makes its own LLM call, and the reply is added to the pool.
+    """
+    pooled = greeting_pool.pick(scammer_message)
+    if pooled is not None:
+        logger.debug("LLM greeting pool hit")
+        return pooled, "llm", True
+
+    reply, source = await llm_service.generate_greeting_reply(scammer_message)
+    if source == "llm":
+        greeting_pool.add(scammer_message, reply)
+    return reply, source, False
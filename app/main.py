@@ -17,151 +17,207 @@ if _env_file.exists():
 else:
     load_dotenv()
 
-from fastapi import FastAPI, Depends, HTTPException, Request, Query
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse, Response
 from typing import Optional
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+import orjson
+import asyncio
+import io
+import hashlib
 import logging
+import queue
 import time
+from itertools import chain
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime, timezone
 
 from models import (
     HoneypotRequest,
     HoneypotResponse,
+    MessageHistory,
     SimulationRequest,
     SimulationResponse,
 )
 from auth import verify_api_key
-from detector import detector
-from extractor import extractor
+from detector import detector, DetectionResult
+from extractor import extractor, IntelCounts
 from agent import agent
 from memory import memory
-from callback import send_final_callback, should_send_callback
+from callback import send_final_callback, should_send_callback, close_client as close_callback_client
 from llm import llm_service, is_greeting_message
-from db import db_service
+from llm_cache import cached_rephrase, batched_greeting
+from db import db_service, db_writer
+from http_cache import response_cache
+from rate_limit import rate_limiter, RATE_LIMIT
 from simulator import simulator
 from intelligence import (
     IntelligenceRegistryService,
     PatternCorrelationService,
     classify_fraud_type,
-    get_fraud_color,
+    fraud_badge,
     generate_detection_reasoning,
+    PATTERN_IDENTIFIER_FIELDS,
 )
 
+# openpyxl for the registry Excel export (imported once, not per request)
+try:
+    from openpyxl import Workbook  # type: ignore[import-untyped]
+    from openpyxl.cell import WriteOnlyCell  # type: ignore[import-untyped]
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side  # type: ignore[import-untyped]
+    from openpyxl.utils import get_column_letter  # type: ignore[import-untyped]
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
 # Initialize intelligence services
 intel_registry = IntelligenceRegistryService(db_service)
 pattern_engine = PatternCorrelationService(db_service)
 
-# ─── Structured Logging ──────────────────────────────────────────────────────
+# ─── Configuration (environment is read once, at import) ────────────────────
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL, logging.INFO),
-    format="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+_default_origins = "https://trusthoneypot.tech,https://www.trusthoneypot.tech,http://localhost:5173,http://localhost:3000"
+_allowed_origins = tuple(o.strip() for o in os.getenv("CORS_ORIGINS", _default_origins).split(",") if o.strip())
+
+# ─── Structured Logging ──────────────────────────────────────────────────────
+# Handlers only enqueue records; a listener thread does the stdout writes,
+# so the event loop never blocks on log I/O. The listener runs for the
+# lifespan: records logged before startup wait in the queue.
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter(
+    fmt="%(asctime)s  %(levelname)-8s  %(name)s  %(message)s",
     datefmt="%Y-%m-%d %H:%M:%S",
-)
+))
+_root_logger = logging.getLogger()
+_root_logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+_root_logger.addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, _log_stream, respect_handler_level=True)
 # Silence noisy third-party loggers in production
 for _noisy in ("httpcore", "httpx", "uvicorn.access", "watchfiles"):
     logging.getLogger(_noisy).setLevel(logging.WARNING)
 logger = logging.getLogger("trusthoneypot")
 
+# ─── Lifespan ─────────────────────────────────────────────────────────────────
+SESSION_SWEEP_INTERVAL = 60  # seconds between stale-session / rate-limit sweeps
+
+
+async def _session_sweeper(stop: asyncio.Event):
+    """
+    Periodically drop stale sessions and idle rate-limit buckets so memory
+    stays bounded. Evicted sessions are cleared from every per-session store
+    through memory.on_evict; a failed sweep is logged and retried next round.
+    """
+    while not stop.is_set():
+        try:
+            memory.cleanup_stale_sessions()
+            memory.enforce_limit()
+            rate_limiter.cleanup_expired()
+        except Exception as e:
+            logger.error("session_sweep_failed  error=%s", e, exc_info=True)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=SESSION_SWEEP_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _forget_session(session_id: str) -> None:
+    """Clear an evicted session from every per-session store outside memory."""
+    detector.reset_session(session_id)
+    extractor.reset_session(session_id)
+    agent.reset_session(session_id)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup: log config, start background workers. Shutdown: drain and close."""
+    _log_listener.start()
+    db_writer.on_write = response_cache.invalidate  # dashboard caches see new writes
+    memory.on_evict = _forget_session  # eviction clears detector/extractor/agent state too
+    db_writer.start()
+    stop_sweeper = asyncio.Event()
+    sweeper = asyncio.create_task(_session_sweeper(stop_sweeper))
+    logger.info("="*60)
+    logger.info("TrustHoneypot API v%s  env=%s", app.version, ENVIRONMENT)
+    logger.info("cors_origins=%s", _allowed_origins)
+    logger.info("rate_limit=%d/min  backend=%s  log_level=%s", RATE_LIMIT, rate_limiter.backend, LOG_LEVEL)
+    logger.info("routes  health=GET /  honeypot=POST /honeypot  docs=%s", "/docs" if app.docs_url else "disabled")
+    logger.info("="*60)
+    
+    yield
+    
+    stop_sweeper.set()
+    await sweeper
+    await db_writer.stop()
+    await llm_service.close()
+    await close_callback_client()
+    await rate_limiter.close()
+    logger.info("Graceful shutdown complete")
+    _log_listener.stop()  # flushes queued records
+
+
 # Create the FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="Agentic Honey-Pot API",
     description="Scam Detection & Intelligence Extraction Platform",
     version="2.2.0",
-    docs_url="/docs" if os.getenv("ENVIRONMENT", "development") != "production" else None,
+    docs_url="/docs" if ENVIRONMENT != "production" else None,
     redoc_url=None,
+    default_response_class=ORJSONResponse,
 )
 
-# CORS — restrict in production, wide open in dev
-_default_origins = "https://trusthoneypot.tech,https://www.trusthoneypot.tech,http://localhost:5173,http://localhost:3000"
-_allowed_origins = [o.strip() for o in os.getenv("CORS_ORIGINS", _default_origins).split(",") if o.strip()]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=_allowed_origins,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
-    expose_headers=["X-Process-Time"],
-)
-
-
 # ─── Production Middleware ────────────────────────────────────────────────────
+# Rate limiting (Redis when REDIS_URL is set, in-memory otherwise) and the
+# X-Process-Time header share one middleware: one call_next frame per
+# request instead of two. CORS preflights never reach it (see below).
 
 @app.middleware("http")
-async def add_timing_header(request: Request, call_next):
-    """Add X-Process-Time header and log request timing."""
-    # Let CORS middleware handle OPTIONS preflight directly
-    if request.method == "OPTIONS":
-        return await call_next(request)
-    start = time.perf_counter()
-    response = await call_next(request)
-    elapsed_ms = (time.perf_counter() - start) * 1000
-    response.headers["X-Process-Time"] = f"{elapsed_ms:.0f}ms"
-    if elapsed_ms > 2000:
-        logger.warning("slow_request  method=%s  path=%s  duration_ms=%.0f", request.method, request.url.path, elapsed_ms)
-    return response
-
-
-# ─── Simple in-memory rate limiter ────────────────────────────────────────────
-
-_rate_store: dict = {}  # ip -> (count, window_start)
-RATE_LIMIT = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
-
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    """Basic per-IP rate limiting for production safety."""
-    # Let CORS middleware handle OPTIONS preflight directly
-    if request.method == "OPTIONS":
-        return await call_next(request)
+async def production_middleware(request: Request, call_next):
+    """Basic per-IP rate limiting, then X-Process-Time header and slow-request log."""
     client_ip = request.client.host if request.client else "unknown"
-    now = time.time()
-    window = 60  # 1 minute window
-    
-    entry = _rate_store.get(client_ip, (0, now))
-    count, window_start = entry
+    result = await rate_limiter.hit(client_ip)
     
-    if now - window_start > window:
-        # New window
-        _rate_store[client_ip] = (1, now)
-    elif count >= RATE_LIMIT:
-        return JSONResponse(
+    if not result.allowed:
+        return ORJSONResponse(
             status_code=429,
             content={"detail": "Rate limit exceeded. Try again in a minute."},
+            headers={
+                "X-RateLimit-Limit": str(result.limit),
+                "X-RateLimit-Remaining": "0",
+                "Retry-After": str(result.retry_after),
+            },
         )
-    else:
-        _rate_store[client_ip] = (count + 1, window_start)
-    
-    # Cleanup old entries periodically (every 100 requests)
-    if len(_rate_store) > 500:
-        cutoff = now - window * 2
-        _rate_store.update({
-            k: v for k, v in _rate_store.items() if v[1] > cutoff
-        })
-    
-    return await call_next(request)
-
-
-@app.on_event("startup")
-async def startup_event():
-    """Log essential startup information and run initial cleanup."""
-    memory.cleanup_stale_sessions()
-    memory.enforce_limit()
-    _env = os.getenv("ENVIRONMENT", "development")
-    logger.info("="*60)
-    logger.info("TrustHoneypot API v%s  env=%s", app.version, _env)
-    logger.info("cors_origins=%s", _allowed_origins)
-    logger.info("rate_limit=%d/min  log_level=%s", RATE_LIMIT, LOG_LEVEL)
-    logger.info("routes  health=GET /  honeypot=POST /honeypot  docs=%s", "/docs" if app.docs_url else "disabled")
-    logger.info("="*60)
+    start_ns = time.monotonic_ns()
+    response = await call_next(request)
+    elapsed_ms = (time.monotonic_ns() - start_ns) // 1_000_000
+    headers = response.headers
+    headers["X-Process-Time"] = f"{elapsed_ms}ms"
+    headers["X-RateLimit-Limit"] = str(result.limit)
+    headers["X-RateLimit-Remaining"] = str(result.remaining)
+    if elapsed_ms > 2000:
+        logger.warning("slow_request  method=%s  path=%s  duration_ms=%d", request.method, request.url.path, elapsed_ms)
+    return response
 
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Clean up resources on shutdown."""
-    await llm_service.close()
-    logger.info("Graceful shutdown complete")
+# CORS — restrict in production, wide open in dev (origins parsed above)
+# Added last so it is the outermost middleware: preflights are answered
+# before rate limiting/timing run, and 429s still carry CORS headers.
+# "*" with credentials is invalid CORS and makes Starlette echo each origin back;
+# a plain wildcard drops credentials. Explicit origins go in a set for O(1) checks.
+_cors_wildcard = "*" in _allowed_origins
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"] if _cors_wildcard else frozenset(_allowed_origins),
+    allow_credentials=not _cors_wildcard,
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
+    allow_headers=["*"],
+    expose_headers=["X-Process-Time", "X-RateLimit-Limit", "X-RateLimit-Remaining", "Retry-After"],
+)
 
 
 @app.exception_handler(RequestValidationError)
@@ -169,7 +225,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     """Log validation errors clearly."""
     logger.error("validation_error  path=%s  detail=%s", request.url.path, exc.errors())
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "detail": exc.errors(),
@@ -189,187 +245,45 @@ async def health_check():
     }
 
 
-@app.post("/honeypot", response_model=HoneypotResponse)
+@app.post("/honeypot", responses={200: {"model": HoneypotResponse}})
 async def process_message(
     request: HoneypotRequest,
+    background: BackgroundTasks,
     api_key: str = Depends(verify_api_key)
 ):
     """Process incoming scam messages and return analysis results."""
     try:
-        import json
-        
         session_id = request.sessionId
         current_message = request.message.text
         response_mode = getattr(request, "response_mode", None) or "rule_based"
         
-        # Log full request body in one line
-        request_dict = request.model_dump()
         logger.info("request  session=%s  mode=%s  message_len=%d", session_id[:8], response_mode, len(current_message))
+        # Full request body in one line (serialized only when DEBUG is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("request_body  session=%s  body=%s", session_id[:8], request.model_dump_json(exclude_none=True))
         
-        # Process conversation history for context
-        # First, update agent's context awareness from history
-        agent.process_conversation_history(session_id, request.conversationHistory)
-        
-        # Only process NEW history messages through detector/extractor
-        # (avoid re-scoring the same messages on every request, which inflates risk scores)
-        _history_key = f"_detector_hist_{session_id}"
-        _already_processed = memory.sessions.get(session_id, {}).get("_detector_history_count", 0)
-        _new_history = request.conversationHistory[_already_processed:]
-        for hist_msg in _new_history:
-            if hist_msg.sender == "scammer":
-                detector.calculate_risk_score(hist_msg.text, session_id)
-                extractor.extract(hist_msg.text, session_id)
-        memory.create_session(session_id)
-        memory.sessions[session_id]["_detector_history_count"] = len(request.conversationHistory)
-        
-        memory.add_message(session_id, "scammer", current_message)
-        
-        # Analyze current message
-        risk_score, is_scam = detector.calculate_risk_score(current_message, session_id)
-        detection_details = detector.get_detection_details(session_id)
-        
-        if is_scam and not memory.is_scam_confirmed(session_id):
-            memory.mark_scam_confirmed(session_id)
-        
-        # Generate internal agent response (not returned to client)
-        scam_confirmed = memory.is_scam_confirmed(session_id)
-        # Use actual conversation length from history, not just server memory count
-        msg_count = len(request.conversationHistory) + 1
-        
-        # Always generate a rule-based reply first (authority)
-        agent_reply = agent.get_reply(session_id, current_message, msg_count, scam_confirmed)
-        reply_source = "rule_based"
-        
-        # ──── LLM Response Generation ────────────────────────────────────────────
-        # If LLM mode requested, we have two paths:
-        # 1. Greeting-stage messages → use dedicated GREETING_LLM_PROMPT
-        # 2. Normal scam messages → rephrase rule-based reply for naturalness
-        if response_mode == "llm":
-            logger.info("llm_mode  session=%s  enabled=%s  model=%s", session_id[:8], llm_service.enabled, llm_service.model_name)
-            if not llm_service.enabled:
-                llm_status = llm_service.get_status()
-                logger.warning("llm_disabled  session=%s  status=%s", session_id[:8], json.dumps(llm_status))
-                reply_source = "rule_based_fallback"
-            elif is_greeting_message(current_message):
-                # PATH 1: Greeting-stage detection
-                # Use specialized greeting prompt that instructs LLM to be warm and polite,
-                # not defensive or suspicious. This prevents the old behavior where LLM
-                # would respond with "I'm not sure what this is about..." to simple "hi" messages.
-                logger.info("llm_greeting  session=%s", session_id[:8])
-                try:
-                    llm_reply, llm_source = await llm_service.generate_greeting_reply(
-                        scammer_message=current_message
-                    )
-                    agent_reply = llm_reply
-                    reply_source = llm_source
-                except Exception as llm_err:
-                    logger.warning("llm_greeting_fallback  session=%s  error=%s", session_id[:8], llm_err)
-                    reply_source = "rule_based_fallback"
-            else:
-                # PATH 2: Normal scam engagement
-                # Rephrase the rule-based reply via LLM for more natural language
-                strategy = agent.get_current_strategy(session_id)
-                # v2.2: pass recent turns for anti-repetition
-                ctx = agent._get_context(session_id)
-                recent_turns = ctx.get("conversation_history", [])[-6:]
-                try:
-                    llm_reply, llm_source = await llm_service.rephrase_reply(
-                        strategy=strategy,
-                        rule_reply=agent_reply,
-                        scammer_message=current_message,
-                        recent_turns=recent_turns,
-                    )
-                    agent_reply = llm_reply
-                    reply_source = llm_source
-                except Exception as llm_err:
-                    logger.warning("llm_rephrase_fallback  session=%s  error=%s", session_id[:8], llm_err)
-                    reply_source = "rule_based_fallback"
-        
-        memory.set_agent_response(session_id, agent_reply)
-        memory.add_message(session_id, "agent", agent_reply)
-        
-        # Extract intelligence
-        intelligence = extractor.extract(current_message, session_id)
-        
-        # Enrich suspiciousKeywords with detected categories for better analysis
-        detected_categories = list(detection_details.triggered_categories)
-        if detection_details.scam_type and detection_details.scam_type != "unknown":
-            detected_categories.append(detection_details.scam_type)
-        existing_keywords = intelligence.get("suspiciousKeywords", [])
-        intelligence["suspiciousKeywords"] = list(set(existing_keywords + detected_categories))
-        
-        # Calculate metrics using conversation history length + 1
-        total_messages = len(request.conversationHistory) + 1
-        duration_seconds = memory.get_duration(session_id)
-        
-        # Generate notes with enhanced detection details (internal use only)
-        if scam_confirmed:
-            agent_notes = agent.generate_agent_notes(
-                session_id, total_messages, intelligence, detection_details
+        turn = await _run_pipeline(session_id, current_message, request.conversationHistory, response_mode)
+        risk_score = turn.risk_score
+        detection_details = turn.detection_details
+        scam_confirmed = turn.scam_confirmed
+        intelligence = turn.intelligence
+        intel_counts = turn.intel_counts
+        tactics_list = turn.tactics_list
+        total_messages = turn.total_messages
+        callback_sent = turn.callback_sent
+        callback_sent_flag = turn.callback_sent_flag
+        if callback_sent:
+            # The portal POST and its record run after the response is sent
+            background.add_task(
+                _send_callback_and_record,
+                session_id, total_messages, intelligence, turn.agent_notes, intel_counts,
             )
-        else:
-            agent_notes = agent.generate_monitoring_notes(session_id, total_messages)
-        
-        # Send callback if conditions met
-        callback_sent = False
-        logger.debug("callback_check  session=%s  scam=%s  msgs=%d", session_id[:8], scam_confirmed, total_messages)
-        callback_eligible = should_send_callback(scam_confirmed, total_messages, intelligence)
-        
-        if callback_eligible:
-            already_sent = memory.is_callback_sent(session_id)
-            logger.info("callback_eligible  session=%s  already_sent=%s", session_id[:8], already_sent)
-            if not already_sent:
-                cb_status, cb_payload = send_final_callback(session_id, total_messages, intelligence, agent_notes)
-                # Always mark callback as processed and save the record,
-                # regardless of whether the external POST succeeded.
-                # This ensures callbacks appear in the UI even when
-                # CALLBACK_URL is not configured or unreachable.
-                memory.mark_callback_sent(session_id)
-                callback_sent = True
-                db_service.save_callback_record(
-                    session_id=session_id,
-                    status=cb_status,
-                    payload_summary={
-                        "totalMessages": total_messages,
-                        "intelligenceCounts": {
-                            "upiIds": len(intelligence.get("upiIds", [])),
-                            "phoneNumbers": len(intelligence.get("phoneNumbers", [])),
-                            "bankAccounts": len(intelligence.get("bankAccounts", [])),
-                            "phishingLinks": len(intelligence.get("phishingLinks", [])),
-                        }
-                    },
-                    intelligence=intelligence,
-                )
-        
-        # Save session summary to DB (every message updates the summary)
-        intel_counts = {
-            "upiIds": len(intelligence.get("upiIds", [])),
-            "phoneNumbers": len(intelligence.get("phoneNumbers", [])),
-            "bankAccounts": len(intelligence.get("bankAccounts", [])),
-            "phishingLinks": len(intelligence.get("phishingLinks", [])),
-            "emails": len(intelligence.get("emails", [])),
-            "suspiciousKeywords": len(intelligence.get("suspiciousKeywords", [])),
-        }
-        tactics_list = list(agent._get_context(session_id).get("detected_tactics", set()))
-        fraud_label = classify_fraud_type(detection_details.scam_type or "unknown")
-        db_service.save_session_summary(
-            session_id=session_id,
-            scam_type=detection_details.scam_type or "unknown",
-            risk_level=detection_details.risk_level or "minimal",
-            confidence=detection_details.confidence,
-            message_count=total_messages,
-            scam_detected=scam_confirmed,
-            intelligence_counts=intel_counts,
-            tactics=tactics_list,
-            response_mode=reply_source,
-            callback_sent=memory.is_callback_sent(session_id),
-            intelligence=intelligence,
-            fraud_type=fraud_label,
-        )
         
         # Register intelligence in the registry (v2.2: conditional on STORAGE_THRESHOLD)
+        # Nothing in the response depends on it, so it runs after the response is sent.
         if risk_score >= detector.STORAGE_THRESHOLD:
-            intel_registry.register_session_intelligence(
+            background.add_task(
+                intel_registry.register_session_intelligence,
                 session_id=session_id,
                 intelligence=intelligence,
                 risk_level=detection_details.risk_level or "minimal",
@@ -377,111 +291,365 @@ async def process_message(
             )
         
         # Register pattern for correlation (v2.2: conditional on PATTERN_THRESHOLD)
-        all_identifiers = (
-            intelligence.get("upiIds", []) +
-            intelligence.get("phoneNumbers", []) +
-            intelligence.get("bankAccounts", []) +
-            intelligence.get("phishingLinks", []) +
-            intelligence.get("emails", [])
-        )
+        # Started now and awaited only where reasoning needs it, so the DB
+        # round-trip overlaps the stage and classification work below.
+        pattern_task = None
         if risk_score >= detector.PATTERN_THRESHOLD:
-            correlation = pattern_engine.register_pattern(
+            pattern_task = asyncio.create_task(asyncio.to_thread(
+                pattern_engine.register_pattern,
                 session_id=session_id,
                 scam_type=detection_details.scam_type or "unknown",
                 tactics=tactics_list,
-                identifiers=all_identifiers,
+                identifiers=chain.from_iterable(
+                    intelligence.get(f, ()) for f in PATTERN_IDENTIFIER_FIELDS
+                ),
                 risk_level=detection_details.risk_level or "minimal",
                 confidence=detection_details.confidence,
-            )
-        else:
-            correlation = {"match_count": 0, "recurring": False, "similarity_score": 0.0}
-        
-        # Build response (status, reply, plus enriched metadata for UI)
-        stage_info = agent.get_engagement_stage(session_id, msg_count, scam_confirmed, callback_sent)
+            ))
         
-        # ──── Greeting Stage Override ─────────────────────────────────────────────
-        # During Stage 0 (Rapport Initialization), when we've only received a greeting,
-        # we don't want to show false positive scam indicators in the UI.
-        # Override risk/confidence to show clean monitoring state:
-        # - risk_level = "minimal" (green)
-        # - confidence = 0.0 (no detection yet)
-        # - scam_type = "unknown" (not classified yet)
-        # This gives a clean UI state until the scammer reveals their actual intent.
-        is_greeting_stage = agent.is_in_greeting_stage(session_id)
-        resp_risk_level = "minimal" if is_greeting_stage else detection_details.risk_level
-        resp_confidence = 0.0 if is_greeting_stage else detection_details.confidence
-        resp_scam_type = "unknown" if is_greeting_stage else (detection_details.scam_type or "unknown")
-        
-        # v2.2 enrichment: fraud classification + conditional detection reasoning
-        fraud_type = classify_fraud_type(resp_scam_type)
-        fraud_color = get_fraud_color(fraud_type)
-        reasoning = generate_detection_reasoning(
-            scam_type=resp_scam_type,
-            risk_level=resp_risk_level or "minimal",
-            confidence=resp_confidence,
-            tactics=tactics_list,
-            intelligence_counts=intel_counts,
-            pattern_match_count=correlation.get("match_count", 0),
-            similarity_score=correlation.get("similarity_score", 0.0),
-            recurring=correlation.get("recurring", False),
-            risk_score=risk_score,
-        )
+        correlation = {"match_count": 0, "recurring": False, "similarity_score": 0.0}
+        try:
+            # Build response (status, reply, plus enriched metadata for UI)
+            stage_info = agent.get_engagement_stage(session_id, total_messages, scam_confirmed, callback_sent)
+            
+            # ──── Greeting Stage Override ─────────────────────────────────────────────
+            # During Stage 0 (Rapport Initialization), when we've only received a greeting,
+            # we don't want to show false positive scam indicators in the UI.
+            # Override risk/confidence to show clean monitoring state:
+            # - risk_level = "minimal" (green)
+            # - confidence = 0.0 (no detection yet)
+            # - scam_type = "unknown" (not classified yet)
+            # This gives a clean UI state until the scammer reveals their actual intent.
+            is_greeting_stage = agent.is_in_greeting_stage(session_id)
+            resp_risk_level = "minimal" if is_greeting_stage else detection_details.risk_level
+            resp_confidence = 0.0 if is_greeting_stage else detection_details.confidence
+            resp_scam_type = "unknown" if is_greeting_stage else (detection_details.scam_type or "unknown")
+            
+            # v2.2 enrichment: fraud classification + conditional detection reasoning
+            fraud_type, fraud_color = fraud_badge(resp_scam_type)
+        finally:
+            if pattern_task is not None:
+                # Awaited even if the work above raised, so the task is never
+                # orphaned. A failed pattern write only loses correlation.
+                try:
+                    correlation = await pattern_task
+                except Exception as e:
+                    logger.warning("pattern_register_failed  session=%s  error=%s", session_id[:8], e)
         
         # v2.2: Conditional visibility — only expose details when risk warrants it
-        resp_detection_reasons = reasoning.get("reasons", []) if risk_score >= detector.REASONING_THRESHOLD else []
+        # (below the threshold the reasons are dropped, so they are never built)
+        resp_detection_reasons = []
+        if risk_score >= detector.REASONING_THRESHOLD:
+            resp_detection_reasons = generate_detection_reasoning(
+                scam_type=resp_scam_type,
+                risk_level=resp_risk_level or "minimal",
+                confidence=resp_confidence,
+                tactics=tactics_list,
+                intelligence_counts=intel_counts,
+                pattern_match_count=correlation.get("match_count", 0),
+                similarity_score=correlation.get("similarity_score", 0.0),
+                recurring=correlation.get("recurring", False),
+                risk_score=risk_score,
+            ).get("reasons", [])
         resp_pattern_similarity = correlation.get("similarity_score", 0.0) if risk_score >= detector.PATTERN_THRESHOLD else 0.0
         
-        response = HoneypotResponse(
-            status="success",
-            reply=agent_reply,
-            reply_source=reply_source,
-            scam_detected=scam_confirmed,
-            risk_score=0 if is_greeting_stage else risk_score,
-            risk_level=resp_risk_level,
-            confidence=resp_confidence,
-            scam_type=resp_scam_type,
-            scam_stage=stage_info["stage"],
-            stage_info=stage_info,
-            intelligence_counts=intel_counts,
-            callback_sent=memory.is_callback_sent(session_id),
-            fraud_type=fraud_type,
-            fraud_color=fraud_color,
-            detection_reasons=resp_detection_reasons,
-            pattern_similarity=resp_pattern_similarity,
-            intelligence=intelligence,
-        )
+        # Plain dict rendered straight to orjson: the payload is our own pipeline
+        # output, so no model validation or response_model pass runs on it
+        # (HoneypotResponse still documents the shape)
+        response = {
+            "status": "success",
+            "reply": turn.agent_reply,
+            "reply_source": turn.reply_source,
+            "scam_detected": scam_confirmed,
+            "risk_score": 0 if is_greeting_stage else risk_score,
+            "risk_level": resp_risk_level,
+            "confidence": resp_confidence,
+            "scam_type": resp_scam_type,
+            "scam_stage": stage_info["stage"],
+            "stage_info": stage_info,
+            "intelligence_counts": intel_counts,
+            "callback_sent": callback_sent_flag,
+            "fraud_type": fraud_type,
+            "fraud_color": fraud_color,
+            "detection_reasons": resp_detection_reasons,
+            "pattern_similarity": resp_pattern_similarity,
+            "intelligence": intelligence,
+        }
         
         # Internal logging - detection result, intelligence, notes, callback (not exposed in response)
-        internal_log = {
-            "scamDetected": scam_confirmed,
-            "replySource": reply_source,
-            "engagementMetrics": {
-                "engagementDurationSeconds": duration_seconds,
-                "totalMessagesExchanged": total_messages
-            },
-            "extractedIntelligence": {
-                "bankAccounts": intelligence.get("bankAccounts", []),
-                "upiIds": intelligence.get("upiIds", []),
-                "phishingLinks": intelligence.get("phishingLinks", []),
-                "phoneNumbers": intelligence.get("phoneNumbers", []),
-                "suspiciousKeywords": intelligence.get("suspiciousKeywords", [])
-            },
-            "agentNotes": agent_notes
-        }
-        logger.debug("agent_internal  session=%s  data=%s", session_id[:8], json.dumps(internal_log, ensure_ascii=False))
+        if logger.isEnabledFor(logging.DEBUG):
+            background.add_task(
+                _log_agent_internal, session_id, scam_confirmed, turn.reply_source,
+                memory.get_duration(session_id), total_messages, intelligence, turn.agent_notes,
+            )
         logger.info(
             "response  session=%s  risk=%s  confidence=%.2f  scam=%s  source=%s  callback=%s",
-            session_id[:8], resp_risk_level, resp_confidence, scam_confirmed, reply_source,
-            "sent" if callback_sent else ("eligible" if callback_eligible else "none"),
+            session_id[:8], resp_risk_level, resp_confidence, scam_confirmed, turn.reply_source,
+            "sent" if callback_sent else ("eligible" if turn.callback_eligible else "none"),
         )
         
-        return response
+        return ORJSONResponse(response)
         
     except Exception as e:
         logger.error("request_failed  error=%s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
+@dataclass(slots=True)
+class _TurnResult:
+    """Outcome of one scammer turn through the shared honeypot pipeline."""
+    risk_score: int
+    detection_details: DetectionResult
+    scam_confirmed: bool
+    agent_reply: str
+    reply_source: str
+    intelligence: dict
+    intel_counts: dict
+    tactics_list: list
+    total_messages: int
+    agent_notes: str  # "" unless a callback is due or DEBUG logging is on
+    callback_eligible: bool
+    callback_sent: bool       # marked sent on this turn; caller dispatches the POST
+    callback_sent_flag: bool  # sent on this or an earlier turn
+
+
+async def _run_pipeline(session_id: str, message_text: str, history: list, response_mode: str) -> _TurnResult:
+    """
+    Detection → agent reply (+LLM) → extraction → callback decision → summary.
+
+    Shared by /honeypot and /simulate so both stay in step. Callers handle
+    what differs: callback dispatch, registry/pattern writes, response shape.
+    """
+    # Process conversation history for context. The agent walks only
+    # NEW history and hands back the new scammer texts, which are then
+    # scored/extracted (re-scoring old messages would inflate risk scores).
+    _new_scammer_texts = agent.process_conversation_history(session_id, history)
+    if _new_scammer_texts:
+        # Replayed inline, on the loop: detector and extractor state is
+        # per-session and unlocked, and a worker thread would let the next
+        # request for this session (which skips the replay) score its
+        # message while the history is still being written
+        detector.calculate_risk_score_bulk(_new_scammer_texts, session_id)
+        extractor.extract_bulk(_new_scammer_texts, session_id)
+    memory.create_session(session_id)
+    
+    memory.add_message(session_id, "scammer", message_text)
+    
+    # Analyze current message
+    risk_score, is_scam = detector.calculate_risk_score(message_text, session_id)
+    detection_details = detector.get_detection_details(session_id)
+    memory.update_detection_view(
+        session_id, detection_details.risk_level, detection_details.scam_type, detection_details.confidence
+    )
+    
+    # Session state read once per turn; locals are updated where state changes
+    scam_confirmed = memory.is_scam_confirmed(session_id)
+    if is_scam and not scam_confirmed:
+        memory.mark_scam_confirmed(session_id)
+        scam_confirmed = True
+    agent_ctx = agent._get_context(session_id)
+    
+    # Generate internal agent response (not returned to client)
+    # Use actual conversation length from history, not just server memory count
+    msg_count = len(history) + 1
+    
+    # Always generate a rule-based reply first (authority)
+    agent_reply = agent.get_reply(session_id, message_text, msg_count, scam_confirmed)
+    reply_source = "rule_based"
+    llm_cache_hit = False  # reply_source stays "llm" for cached LLM output
+    
+    # ──── LLM Response Generation ────────────────────────────────────────────
+    # If LLM mode requested, we have two paths:
+    # 1. Greeting-stage messages → use dedicated GREETING_LLM_PROMPT
+    # 2. Normal scam messages → rephrase rule-based reply for naturalness
+    if response_mode == "llm":
+        logger.info("llm_mode  session=%s  enabled=%s  model=%s", session_id[:8], llm_service.enabled, llm_service.model_name)
+        if not llm_service.enabled:
+            if logger.isEnabledFor(logging.WARNING):
+                llm_status = llm_service.get_status()
+                logger.warning("llm_disabled  session=%s  status=%s", session_id[:8], orjson.dumps(llm_status).decode())
+            reply_source = "rule_based_fallback"
+        elif is_greeting_message(message_text):
+            # PATH 1: Greeting-stage detection
+            # Use specialized greeting prompt that instructs LLM to be warm and polite,
+            # not defensive or suspicious. This prevents the old behavior where LLM
+            # would respond with "I'm not sure what this is about..." to simple "hi" messages.
+            logger.info("llm_greeting  session=%s", session_id[:8])
+            try:
+                llm_reply, llm_source, llm_cache_hit = await batched_greeting(message_text)
+                agent_reply = llm_reply
+                reply_source = llm_source
+            except Exception as llm_err:
+                logger.warning("llm_greeting_fallback  session=%s  error=%s", session_id[:8], llm_err)
+                reply_source = "rule_based_fallback"
+        else:
+            # PATH 2: Normal scam engagement
+            # Rephrase the rule-based reply via LLM for more natural language
+            strategy = agent.get_current_strategy(session_id)
+            # v2.2: pass recent turns for anti-repetition
+            recent_turns = agent_ctx.get("conversation_history", [])[-6:]
+            try:
+                llm_reply, llm_source, llm_cache_hit = await cached_rephrase(
+                    strategy=strategy,
+                    rule_reply=agent_reply,
+                    scammer_message=message_text,
+                    recent_turns=recent_turns,
+                )
+                agent_reply = llm_reply
+                reply_source = llm_source
+            except Exception as llm_err:
+                logger.warning("llm_rephrase_fallback  session=%s  error=%s", session_id[:8], llm_err)
+                reply_source = "rule_based_fallback"
+    
+    memory.set_agent_response(session_id, agent_reply)
+    memory.add_message(session_id, "agent", agent_reply)
+    
+    # Extract intelligence (skip the regex sweep if this exact text was just extracted)
+    msg_hash = hashlib.blake2b(message_text.encode(), digest_size=8).digest()
+    if memory.last_extracted_hash(session_id) == msg_hash:
+        intelligence = extractor.snapshot(session_id)
+    else:
+        intelligence = extractor.extract(message_text, session_id)
+        memory.set_last_extracted_hash(session_id, msg_hash)
+    
+    # Enrich suspiciousKeywords with detected categories for better analysis
+    # (merged as a set, listed once, sorted so the output order is stable)
+    keywords = set(intelligence.get("suspiciousKeywords", ()))
+    keywords.update(detection_details.triggered_categories)
+    if detection_details.scam_type and detection_details.scam_type != "unknown":
+        keywords.add(detection_details.scam_type)
+    intelligence["suspiciousKeywords"] = sorted(keywords)
+    
+    # Metrics use conversation history length + 1 (same count the agent got)
+    total_messages = msg_count
+    
+    # Counted once, reused by callback record, DB summary and response
+    intel_counts = IntelCounts.from_intelligence(intelligence).as_dict()
+    
+    # Send callback if conditions met
+    callback_sent = False
+    logger.debug("callback_check  session=%s  scam=%s  msgs=%d", session_id[:8], scam_confirmed, total_messages)
+    callback_eligible = should_send_callback(scam_confirmed, total_messages, intel_counts)
+    
+    already_sent = memory.is_callback_sent(session_id)
+    if callback_eligible:
+        logger.info("callback_eligible  session=%s  already_sent=%s", session_id[:8], already_sent)
+        if not already_sent:
+            # Always mark callback as processed and save the record,
+            # regardless of whether the external POST succeeded.
+            # This ensures callbacks appear in the UI even when
+            # CALLBACK_URL is not configured or unreachable.
+            # Marked here, before the caller sends, so a concurrent turn
+            # can't send twice.
+            memory.mark_callback_sent(session_id)
+            callback_sent = True  # caller dispatches the POST
+    
+    # Summary and response must agree on the callback state
+    callback_sent_flag = already_sent or callback_sent
+    
+    # Notes with enhanced detection details (internal use only) feed just the
+    # callback payload and the DEBUG internal log, so skip them otherwise
+    agent_notes = ""
+    if callback_sent or logger.isEnabledFor(logging.DEBUG):
+        if scam_confirmed:
+            agent_notes = agent.generate_agent_notes(
+                session_id, total_messages, intelligence, detection_details
+            )
+        else:
+            agent_notes = agent.generate_monitoring_notes(session_id, total_messages)
+    
+    # Save session summary to DB (every message updates the summary)
+    tactics_list = list(agent_ctx.get("detected_tactics", ()))
+    fraud_label = classify_fraud_type(detection_details.scam_type or "unknown")
+    db_writer.put(
+        "summary",
+        session_id=session_id,
+        scam_type=detection_details.scam_type or "unknown",
+        risk_level=detection_details.risk_level or "minimal",
+        confidence=detection_details.confidence,
+        message_count=total_messages,
+        scam_detected=scam_confirmed,
+        intelligence_counts=intel_counts,
+        tactics=tactics_list,
+        response_mode=reply_source,
+        llm_cache_hit=llm_cache_hit,
+        callback_sent=callback_sent_flag,
+        intelligence=intelligence,
+        fraud_type=fraud_label,
+    )
+    
+    return _TurnResult(
+        risk_score=risk_score,
+        detection_details=detection_details,
+        scam_confirmed=scam_confirmed,
+        agent_reply=agent_reply,
+        reply_source=reply_source,
+        intelligence=intelligence,
+        intel_counts=intel_counts,
+        tactics_list=tactics_list,
+        total_messages=total_messages,
+        agent_notes=agent_notes,
+        callback_eligible=callback_eligible,
+        callback_sent=callback_sent,
+        callback_sent_flag=callback_sent_flag,
+    )
+
+
+async def _send_callback_and_record(
+    session_id: str,
+    total_messages: int,
+    intelligence: dict,
+    agent_notes: str,
+    intel_counts: dict,
+    source: Optional[str] = None,
+) -> str:
+    """POST the final callback, then queue its record. Returns the callback status."""
+    cb_status, _ = await send_final_callback(session_id, total_messages, intelligence, agent_notes)
+    payload_summary = {
+        "totalMessages": total_messages,
+        "intelligenceCounts": intel_counts,
+    }
+    if source:
+        payload_summary["source"] = source
+    db_writer.put(
+        "callback",
+        session_id=session_id,
+        status=cb_status,
+        payload_summary=payload_summary,
+        intelligence=intelligence,
+    )
+    return cb_status
+
+
+def _log_agent_internal(
+    session_id: str,
+    scam_confirmed: bool,
+    reply_source: str,
+    duration_seconds: int,
+    total_messages: int,
+    intelligence: dict,
+    agent_notes: str,
+):
+    """Debug-log the internal result (detection, intelligence, notes) after the response."""
+    internal_log = {
+        "scamDetected": scam_confirmed,
+        "replySource": reply_source,
+        "engagementMetrics": {
+            "engagementDurationSeconds": duration_seconds,
+            "totalMessagesExchanged": total_messages
+        },
+        "extractedIntelligence": {
+            "bankAccounts": intelligence.get("bankAccounts", []),
+            "upiIds": intelligence.get("upiIds", []),
+            "phishingLinks": intelligence.get("phishingLinks", []),
+            "phoneNumbers": intelligence.get("phoneNumbers", []),
+            "suspiciousKeywords": intelligence.get("suspiciousKeywords", [])
+        },
+        "agentNotes": agent_notes
+    }
+    logger.debug("agent_internal  session=%s  data=%s", session_id[:8], orjson.dumps(internal_log).decode())
+
+
 def _get_scam_stage(msg_count: int, scam_confirmed: bool, callback_sent: bool) -> str:
     """Determine the scam lifecycle stage (legacy helper, prefer agent.get_engagement_stage)."""
     if callback_sent:
@@ -528,7 +696,7 @@ async def get_scenario_detail(scenario_id: str, api_key: str = Depends(verify_ap
     }
 
 
-@app.post("/simulate", response_model=SimulationResponse)
+@app.post("/simulate", responses={200: {"model": SimulationResponse}})
 async def run_simulation(
     request: SimulationRequest,
     api_key: str = Depends(verify_api_key)
@@ -540,8 +708,6 @@ async def run_simulation(
     pipeline (detection → agent response → extraction → callback check).
     Returns the complete conversation with stage progression and analysis.
     """
-    import json as _json
-    
     scenario = simulator.get_scenario(request.scenario_id)
     if not scenario:
         raise HTTPException(
@@ -550,136 +716,33 @@ async def run_simulation(
         )
     
     async def honeypot_handler(session_id, message_text, history, response_mode):
-        """Internal handler that mirrors /honeypot logic for simulation."""
-        from models import Message
-        
-        # Build message history objects
-        history_msgs = [Message(sender=h["sender"], text=h["text"]) for h in history]
-        
-        # Process conversation history (only new messages)
-        agent.process_conversation_history(session_id, history_msgs)
-        
-        _already = memory.sessions.get(session_id, {}).get("_detector_history_count", 0)
-        for hist_msg in history_msgs[_already:]:
-            if hist_msg.sender == "scammer":
-                detector.calculate_risk_score(hist_msg.text, session_id)
-                extractor.extract(hist_msg.text, session_id)
-        memory.create_session(session_id)
-        memory.sessions[session_id]["_detector_history_count"] = len(history_msgs)
-        
-        memory.add_message(session_id, "scammer", message_text)
-        
-        # Analyze current message
-        risk_score, is_scam = detector.calculate_risk_score(message_text, session_id)
-        detection_details = detector.get_detection_details(session_id)
-        
-        if is_scam and not memory.is_scam_confirmed(session_id):
-            memory.mark_scam_confirmed(session_id)
-        
-        scam_confirmed = memory.is_scam_confirmed(session_id)
-        msg_count = len(history) + 1
-        
-        # Generate agent reply
-        agent_reply = agent.get_reply(session_id, message_text, msg_count, scam_confirmed)
-        reply_source = "rule_based"
-        
-        # LLM generation/rephrasing if requested
-        if response_mode == "llm":
-            if is_greeting_message(message_text):
-                # Greeting-stage: use dedicated greeting LLM prompt
-                try:
-                    llm_reply, llm_source = await llm_service.generate_greeting_reply(
-                        scammer_message=message_text
-                    )
-                    agent_reply = llm_reply
-                    reply_source = llm_source
-                except Exception:
-                    reply_source = "rule_based_fallback"
-            else:
-                # Normal scam engagement: rephrase rule-based reply via LLM
-                strategy = agent.get_current_strategy(session_id)
-                # v2.2: pass recent turns for anti-repetition
-                ctx = agent._get_context(session_id)
-                recent_turns = ctx.get("conversation_history", [])[-6:]
-                try:
-                    llm_reply, llm_source = await llm_service.rephrase_reply(
-                        strategy=strategy,
-                        rule_reply=agent_reply,
-                        scammer_message=message_text,
-                        recent_turns=recent_turns,
-                    )
-                    agent_reply = llm_reply
-                    reply_source = llm_source
-                except Exception:
-                    reply_source = "rule_based_fallback"
-        
-        memory.set_agent_response(session_id, agent_reply)
-        memory.add_message(session_id, "agent", agent_reply)
-        
-        # Extract intelligence
-        intelligence = extractor.extract(message_text, session_id)
-        intel_counts = {
-            "upiIds": len(intelligence.get("upiIds", [])),
-            "phoneNumbers": len(intelligence.get("phoneNumbers", [])),
-            "bankAccounts": len(intelligence.get("bankAccounts", [])),
-            "phishingLinks": len(intelligence.get("phishingLinks", [])),
-            "emails": len(intelligence.get("emails", [])),
-            "suspiciousKeywords": len(intelligence.get("suspiciousKeywords", [])),
-        }
-        
-        # Check callback
-        total_messages = len(history) + 1
-        callback_sent = False
-        callback_eligible = should_send_callback(scam_confirmed, total_messages, intelligence)
-        if callback_eligible and not memory.is_callback_sent(session_id):
-            agent_notes = agent.generate_agent_notes(session_id, total_messages, intelligence, detection_details)
-            cb_status, cb_payload = send_final_callback(session_id, total_messages, intelligence, agent_notes)
-            memory.mark_callback_sent(session_id)
-            callback_sent = True
-            db_service.save_callback_record(
-                session_id=session_id,
-                status=cb_status,
-                payload_summary={
-                    "totalMessages": total_messages,
-                    "intelligenceCounts": intel_counts,
-                    "source": "simulation",
-                },
-                intelligence=intelligence,
+        """Run one simulated scammer turn through the shared /honeypot pipeline."""
+        history_msgs = MessageHistory.validate_python(history)
+        turn = await _run_pipeline(session_id, message_text, history_msgs, response_mode)
+        if turn.callback_sent:
+            # Awaited inline: the simulation reports the callback in its result
+            cb_status = await _send_callback_and_record(
+                session_id, turn.total_messages, turn.intelligence, turn.agent_notes,
+                turn.intel_counts, source="simulation",
             )
             logger.info("sim_callback_saved  session=%s  status=%s", session_id[:8], cb_status)
         
-        # Save session summary to DB (was missing in simulation handler!)
-        tactics_list = list(agent._get_context(session_id).get("detected_tactics", set()))
-        fraud_label = classify_fraud_type(detection_details.scam_type or "unknown")
-        db_service.save_session_summary(
-            session_id=session_id,
-            scam_type=detection_details.scam_type or "unknown",
-            risk_level=detection_details.risk_level or "minimal",
-            confidence=detection_details.confidence,
-            message_count=total_messages,
-            scam_detected=scam_confirmed,
-            intelligence_counts=intel_counts,
-            tactics=tactics_list,
-            response_mode=reply_source,
-            callback_sent=memory.is_callback_sent(session_id),
-            intelligence=intelligence,
-            fraud_type=fraud_label,
+        stage_info = agent.get_engagement_stage(
+            session_id, turn.total_messages, turn.scam_confirmed, turn.callback_sent_flag
         )
         
-        stage_info = agent.get_engagement_stage(session_id, msg_count, scam_confirmed, callback_sent or memory.is_callback_sent(session_id))
-        
         return {
-            "reply": agent_reply,
-            "reply_source": reply_source,
-            "scam_detected": scam_confirmed,
-            "risk_score": risk_score,
-            "risk_level": detection_details.risk_level,
-            "confidence": detection_details.confidence,
-            "scam_type": detection_details.scam_type or "unknown",
+            "reply": turn.agent_reply,
+            "reply_source": turn.reply_source,
+            "scam_detected": turn.scam_confirmed,
+            "risk_score": turn.risk_score,
+            "risk_level": turn.detection_details.risk_level,
+            "confidence": turn.detection_details.confidence,
+            "scam_type": turn.detection_details.scam_type or "unknown",
             "scam_stage": stage_info["stage"],
             "stage_info": stage_info,
-            "intelligence_counts": intel_counts,
-            "callback_sent": callback_sent or memory.is_callback_sent(session_id),
+            "intelligence_counts": turn.intel_counts,
+            "callback_sent": turn.callback_sent_flag,
         }
     
     logger.info("simulation_start  scenario=%s  mode=%s", request.scenario_id, request.response_mode)
@@ -693,58 +756,79 @@ async def run_simulation(
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     
-    return result
+    # Rendered straight to orjson: no response_model dump/re-validate pass over
+    # the conversation (SimulationResponse still documents the schema)
+    return ORJSONResponse(result)
 
 
 # ─── Read-Only Endpoints for UI ──────────────────────────────────────────────
 
+# Type mappings for intelligence registry normalization (getters pre-bound
+# for the per-request / per-row lookups below)
+_TYPE_FILTER_MAP = {"upi": "UPI", "phone": "Phone", "bank_account": "Bank", "link": "Link", "email": "Email"}
+_TYPE_DISPLAY_MAP = {"UPI": "upi", "Phone": "phone", "Bank": "bank_account", "Link": "link", "Email": "email"}
+_filter_type = _TYPE_FILTER_MAP.get
+_display_type = _TYPE_DISPLAY_MAP.get
+
+
+class DashboardJSONResponse(ORJSONResponse):
+    """
+    Returned directly by the list endpoints, so FastAPI skips the
+    jsonable_encoder walk over every row. pymongo hands back naive UTC
+    datetimes; orjson renders them with a "Z" suffix, the format the
+    UI expects, so rows need no per-item isoformat plumbing.
+    """
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(
+            content,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z,
+        )
+
+
 @app.get("/sessions")
 async def get_sessions(
     limit: int = Query(default=50, le=200),
     api_key: str = Depends(verify_api_key)
 ):
     """Get session summaries (no raw chats). For UI dashboard."""
-    summaries = db_service.get_session_summaries(limit=limit)
+    # DB rows are normalized inside the cached compute, so cache hits skip it
+    rows = await response_cache.get_or_compute(("sessions", limit), lambda: _session_rows(limit))
+    # Also include in-memory sessions not yet in DB (rows maintained by memory)
+    return DashboardJSONResponse({"sessions": [*rows, *memory.session_view.values()]})
+
+
+def _session_rows(limit: int) -> list:
+    """Load and normalize session summaries (cached by get_sessions)."""
+    summaries = db_service.get_session_summaries(limit=limit, fields=db_service.SESSION_LIST_FIELDS)
     # Normalize DB records (camelCase) to snake_case for frontend
     normalized = []
+    append = normalized.append
     for s in summaries:
-        scam_type = s.get("scamType", "unknown")
+        get = s.get
+        scam_type = get("scamType", "unknown")
+        fraud_type, fraud_color = fraud_badge(scam_type)
         # v2.2: include timestamp for session time column
-        ts = s.get("timestamp")
-        if ts and hasattr(ts, 'isoformat'):
-            ts = ts.isoformat()
+        # (datetimes get their "Z" from DashboardJSONResponse; legacy strings here)
+        ts = get("timestamp")
         if isinstance(ts, str) and not ts.endswith('Z') and '+' not in ts:
             ts = ts + 'Z'
-        normalized.append({
-            "session_id": s.get("sessionId", ""),
+        append({
+            "session_id": get("sessionId", ""),
             "scam_type": scam_type,
-            "fraud_type": classify_fraud_type(scam_type),
-            "fraud_color": get_fraud_color(classify_fraud_type(scam_type)),
-            "risk_level": s.get("riskLevel", "minimal"),
-            "confidence": s.get("confidence", 0.0),
-            "message_count": s.get("messageCount", 0),
-            "scam_confirmed": s.get("scamDetected", False),
-            "intelligence_counts": s.get("intelligenceTypes", {}),
-            "callback_sent": s.get("callbackSent", False),
-            "response_mode": s.get("responseMode", "rule_based"),
-            "tactics": s.get("tactics", []),
+            "fraud_type": fraud_type,
+            "fraud_color": fraud_color,
+            "risk_level": get("riskLevel", "minimal"),
+            "confidence": get("confidence", 0.0),
+            "message_count": get("messageCount", 0),
+            "scam_confirmed": get("scamDetected", False),
+            "intelligence_counts": get("intelligenceTypes", {}),
+            "callback_sent": get("callbackSent", False),
+            "response_mode": get("responseMode", "rule_based"),
+            "tactics": get("tactics", []),
             "timestamp": ts,
         })
-    # Also include in-memory sessions not yet in DB
-    for sid, session in memory.sessions.items():
-        det = detector.get_detection_details(sid)
-        normalized.append({
-            "session_id": sid,
-            "scam_confirmed": session.get("scamConfirmed", False),
-            "message_count": session.get("messageCount", 0),
-            "callback_sent": session.get("callbackSent", False),
-            "risk_level": getattr(det, "risk_level", "minimal"),
-            "scam_type": getattr(det, "scam_type", "unknown"),
-            "confidence": getattr(det, "confidence", 0.0),
-            "intelligence_counts": {},
-            "active": True,
-        })
-    return {"sessions": normalized}
+    return normalized
 
 
 @app.get("/sessions/{session_id}")
@@ -753,16 +837,16 @@ async def get_session_detail(
     api_key: str = Depends(verify_api_key)
 ):
     """Get a single session's summary."""
-    summary = db_service.get_session_summary(session_id)
+    summary = await asyncio.to_thread(db_service.get_session_summary, session_id)
     det = detector.get_detection_details(session_id)
     intel = extractor.get_intelligence_summary(session_id)
     return {
         "summary": summary,
         "detection": {
-            "riskLevel": getattr(det, "risk_level", "minimal"),
-            "confidence": getattr(det, "confidence", 0.0),
-            "scamType": getattr(det, "scam_type", "unknown"),
-            "riskScore": getattr(det, "total_score", 0),
+            "riskLevel": det.risk_level,
+            "confidence": det.confidence,
+            "scamType": det.scam_type,
+            "riskScore": det.total_score,
         },
         "intelligenceCounts": intel,
     }
@@ -771,7 +855,9 @@ async def get_session_detail(
 @app.get("/patterns")
 async def get_patterns(api_key: str = Depends(verify_api_key)):
     """Get aggregated scam patterns and learning data."""
-    return db_service.get_patterns()
+    return DashboardJSONResponse(
+        await response_cache.get_or_compute(("patterns",), db_service.get_patterns)
+    )
 
 
 @app.get("/callbacks")
@@ -780,28 +866,31 @@ async def get_callbacks(
     api_key: str = Depends(verify_api_key)
 ):
     """Get callback records for UI."""
+    return DashboardJSONResponse(
+        await response_cache.get_or_compute(("callbacks", limit), lambda: _build_callbacks(limit))
+    )
+
+
+def _build_callbacks(limit: int) -> dict:
+    """Load and normalize callback records (cached by get_callbacks)."""
     records = db_service.get_callback_records(limit=limit)
+    # Session scam types for the fraud labels, in one query (not one per record)
+    scam_types = db_service.get_scam_types_bulk([r.get("sessionId", "") for r in records])
     # Normalize camelCase -> snake_case for frontend
     normalized = []
     for r in records:
-        # Convert timestamp to ISO format string with timezone
+        # Datetimes get their "Z" from DashboardJSONResponse; legacy strings here
         ts = r.get("timestamp")
-        if ts:
-            if hasattr(ts, 'isoformat'):
-                ts = ts.isoformat()
-            # Ensure it ends with Z for UTC
-            if isinstance(ts, str) and not ts.endswith('Z') and '+' not in ts:
-                ts = ts + 'Z'
-        # Lookup session scam type for fraud label
-        session_summary = db_service.get_session_summary(r.get("sessionId", ""))
-        scam_type = session_summary.get("scamType", "unknown") if session_summary else "unknown"
+        if isinstance(ts, str) and ts and not ts.endswith('Z') and '+' not in ts:
+            ts = ts + 'Z'
+        fraud_type, fraud_color = fraud_badge(scam_types.get(r.get("sessionId", ""), "unknown"))
         normalized.append({
             "session_id": r.get("sessionId", ""),
             "status": r.get("status", "unknown"),
             "payload_summary": r.get("payloadSummary", None),
             "intelligence": r.get("intelligence", None),
-            "fraud_type": classify_fraud_type(scam_type),
-            "fraud_color": get_fraud_color(classify_fraud_type(scam_type)),
+            "fraud_type": fraud_type,
+            "fraud_color": fraud_color,
             "timestamp": ts,
         })
     return {"callbacks": normalized}
@@ -817,19 +906,31 @@ async def get_intelligence_registry(
     api_key: str = Depends(verify_api_key),
 ):
     """Get intelligence registry entries with optional filters."""
-    db_type = _TYPE_FILTER_MAP.get(type) if type else None
-    entries = intel_registry.get_registry(id_type=db_type, risk_level=risk, limit=limit)
-    stats = intel_registry.get_registry_stats()
-    identifiers = [_normalize_registry_entry(e) for e in entries]
-    return {
+    db_type = _filter_type(type) if type else None
+    # Both cached briefly (dashboard polls); stats are shared by every filter
+    entries, stats = await asyncio.gather(
+        response_cache.get_or_compute(
+            ("registry", db_type, risk, limit),
+            lambda: intel_registry.get_registry(id_type=db_type, risk_level=risk, limit=limit),
+        ),
+        response_cache.get_or_compute(("registry_stats",), intel_registry.get_registry_stats),
+    )
+    # One pass: normalize and count recurring identifiers together
+    identifiers = []
+    recurring = 0
+    for e in entries:
+        normalized = _normalize_registry_entry(e)
+        recurring += normalized["is_recurring"]
+        identifiers.append(normalized)
+    return DashboardJSONResponse({
         "identifiers": identifiers,
         "stats": {
             "total_identifiers": stats.get("total", 0),
             "by_type": stats.get("by_type", {}),
             "by_risk": stats.get("by_risk", {}),
-            "recurring_count": sum(1 for i in identifiers if i["is_recurring"]),
+            "recurring_count": recurring,
         },
-    }
+    })
 
 
 @app.get("/intelligence/registry/{identifier}")
@@ -838,21 +939,16 @@ async def get_identifier_detail(
     api_key: str = Depends(verify_api_key),
 ):
     """Get detailed info for a specific identifier."""
-    detail = intel_registry.get_identifier_detail(identifier)
+    detail = await asyncio.to_thread(intel_registry.get_identifier_detail, identifier)
     if not detail:
         raise HTTPException(status_code=404, detail="Identifier not found")
     occ = detail.get("occurrences", 1)
     sessions = detail.get("sessions", [])
-    # Lookup fraud types from associated sessions
-    fraud_types = set()
-    for sid in sessions[:20]:
-        s = db_service.get_session_summary(sid)
-        if s:
-            fraud_types.add(classify_fraud_type(s.get("scamType", "unknown")))
+    fraud_types = await asyncio.to_thread(_session_fraud_types, sessions[:20])
     return {
         "identifier": detail.get("value", identifier),
         "masked_value": detail.get("masked", identifier),
-        "type": _TYPE_DISPLAY_MAP.get(detail.get("type", ""), detail.get("type", "").lower()),
+        "type": _display_type(detail.get("type", "")) or detail.get("type", "").lower(),
         "risk_level": detail.get("riskLevel", ""),
         "confidence": detail.get("confidence", 0),
         "frequency": occ,
@@ -864,32 +960,37 @@ async def get_identifier_detail(
     }
 
 
-# Type mappings for intelligence registry normalization
-_TYPE_FILTER_MAP = {"upi": "UPI", "phone": "Phone", "bank_account": "Bank", "link": "Link", "email": "Email"}
-_TYPE_DISPLAY_MAP = {"UPI": "upi", "Phone": "phone", "Bank": "bank_account", "Link": "link", "Email": "email"}
+def _session_fraud_types(session_ids: list) -> set:
+    """Lookup fraud types from associated sessions (one blocking DB read)."""
+    return {classify_fraud_type(t) for t in db_service.get_scam_types_bulk(session_ids).values()}
 
 
 def _normalize_registry_entry(e: dict) -> dict:
     """Normalize a registry entry from DB camelCase to frontend snake_case."""
-    occ = e.get("occurrences", 1)
+    # Called per row (up to 5000 for the export): bind the getter and read
+    # the repeated fields once
+    get = e.get
+    occ = get("occurrences", 1)
+    value = get("value", "")
+    id_type = get("type", "")
     return {
-        "identifier": e.get("value", ""),
-        "masked_value": e.get("masked", e.get("value", "")),
-        "type": _TYPE_DISPLAY_MAP.get(e.get("type", ""), e.get("type", "").lower()),
-        "risk_level": e.get("riskLevel", ""),
-        "confidence": e.get("confidence", 0),
+        "identifier": value,
+        "masked_value": get("masked", value),
+        "type": _display_type(id_type) or id_type.lower(),
+        "risk_level": get("riskLevel", ""),
+        "confidence": get("confidence", 0),
         "frequency": occ,
         "is_recurring": occ > 1,
-        "first_seen": e.get("firstSeen", ""),
-        "last_seen": e.get("lastSeen", ""),
-        "sessions": e.get("sessions", []),
+        "first_seen": get("firstSeen", ""),
+        "last_seen": get("lastSeen", ""),
+        "sessions": get("sessions", []),
     }
 
 
 @app.get("/intelligence/patterns")
 async def get_pattern_correlation(api_key: str = Depends(verify_api_key)):
     """Get pattern correlation statistics."""
-    raw = pattern_engine.get_pattern_stats()
+    raw = await response_cache.get_or_compute(("pattern_stats",), pattern_engine.get_pattern_stats)
     patterns = []
     for p in raw.get("top_patterns", []):
         cnt = p.get("count", 0)
@@ -900,7 +1001,7 @@ async def get_pattern_correlation(api_key: str = Depends(verify_api_key)):
             "hash": p.get("hash", ""),
             "tactics": p.get("tactics", []),
         })
-    return {
+    return DashboardJSONResponse({
         "patterns": patterns,
         "stats": {
             "total_patterns": raw.get("total_patterns", 0),
@@ -908,7 +1009,7 @@ async def get_pattern_correlation(api_key: str = Depends(verify_api_key)):
             "avg_similarity": raw.get("avg_similarity", 0.0),
             "unique_scam_types": raw.get("unique_scam_types", 0),
         },
-    }
+    })
 
 
 @app.get("/sessions/{session_id}/analysis")
@@ -917,53 +1018,38 @@ async def get_session_analysis(
     api_key: str = Depends(verify_api_key),
 ):
     """Get enhanced session analysis with detection reasoning (v2.2)."""
-    summary = db_service.get_session_summary(session_id)
+    # Summary and pattern-registry lookups are independent DB reads
+    summary, correlation_info = await asyncio.gather(
+        asyncio.to_thread(db_service.get_session_summary, session_id),
+        asyncio.to_thread(_session_correlation, session_id),
+    )
     det = detector.get_detection_details(session_id)
     intel = extractor.get_intelligence_summary(session_id)
     
     # Pattern correlation
     tactics = summary.get("tactics", []) if summary else []
-    scam_type = summary.get("scamType", "unknown") if summary else getattr(det, "scam_type", "unknown")
-    
-    # Get correlation info from pattern registry
-    correlation_info = {"match_count": 0, "recurring": False, "similarity_score": 0.0}
-    if db_service.enabled and db_service.db is not None:
-        try:
-            pattern_doc = db_service.db.pattern_registry.find_one(
-                {"sessionId": session_id}, {"_id": 0}
-            )
-            if pattern_doc:
-                from pymongo import DESCENDING
-                similar = db_service.db.pattern_registry.count_documents(
-                    {"patternHash": pattern_doc.get("patternHash"), "sessionId": {"$ne": session_id}}
-                )
-                correlation_info["match_count"] = similar
-                correlation_info["recurring"] = similar > 0
-                correlation_info["similarity_score"] = 1.0 if similar > 0 else 0.0
-                correlation_info["pattern_hash"] = pattern_doc.get("patternHash")
-        except Exception:
-            pass
+    scam_type = summary.get("scamType", "unknown") if summary else det.scam_type
     
     reasoning = generate_detection_reasoning(
         scam_type=scam_type,
-        risk_level=getattr(det, "risk_level", "minimal"),
-        confidence=getattr(det, "confidence", 0.0),
+        risk_level=det.risk_level,
+        confidence=det.confidence,
         tactics=tactics,
         intelligence_counts=intel,
         pattern_match_count=correlation_info["match_count"],
         similarity_score=correlation_info["similarity_score"],
         recurring=correlation_info["recurring"],
-        risk_score=getattr(det, "total_score", 0),
+        risk_score=det.total_score,
     )
     
     return {
         "session_id": session_id,
         "summary": summary,
         "detection": {
-            "riskLevel": getattr(det, "risk_level", "minimal"),
-            "confidence": getattr(det, "confidence", 0.0),
+            "riskLevel": det.risk_level,
+            "confidence": det.confidence,
             "scamType": scam_type,
-            "riskScore": getattr(det, "total_score", 0),
+            "riskScore": det.total_score,
         },
         "intelligenceCounts": intel,
         "reasoning": reasoning,
@@ -972,6 +1058,29 @@ async def get_session_analysis(
     }
 
 
+def _session_correlation(session_id: str) -> dict:
+    """Get correlation info from pattern registry (blocking DB reads)."""
+    correlation_info = {"match_count": 0, "recurring": False, "similarity_score": 0.0}
+    if db_service.enabled and db_service.db is not None:
+        try:
+            # Two index-backed queries (sessionId, then patternHash). A $lookup
+            # join would scan the collection on MongoDB < 5.0 (let/pipeline
+            # form) or pull every matching document into one array.
+            coll = db_service.db.pattern_registry
+            pattern_doc = coll.find_one({"sessionId": session_id}, {"_id": 0, "patternHash": 1})
+            if pattern_doc:
+                similar = coll.count_documents(
+                    {"patternHash": pattern_doc.get("patternHash"), "sessionId": {"$ne": session_id}}
+                )
+                correlation_info["match_count"] = similar
+                correlation_info["recurring"] = similar > 0
+                correlation_info["similarity_score"] = 1.0 if similar > 0 else 0.0
+                correlation_info["pattern_hash"] = pattern_doc.get("patternHash")
+        except Exception:
+            pass
+    return correlation_info
+
+
 @app.get("/intelligence/export")
 async def export_intelligence_excel(
     type: Optional[str] = Query(default=None),
@@ -981,38 +1090,46 @@ async def export_intelligence_excel(
     api_key: str = Depends(verify_api_key),
 ):
     """Export intelligence registry to Excel (.xlsx)."""
-    from fastapi.responses import StreamingResponse
-    import io
-    
-    try:
-        from openpyxl import Workbook  # type: ignore[import-untyped]
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side  # type: ignore[import-untyped]
-    except ImportError:
+    if not OPENPYXL_AVAILABLE:
         raise HTTPException(status_code=500, detail="openpyxl not installed")
     
-    db_type = _TYPE_FILTER_MAP.get(type) if type else None
-    entries = intel_registry.get_registry(id_type=db_type, risk_level=risk, limit=5000)
+    db_type = _filter_type(type) if type else None
+    entries = await asyncio.to_thread(intel_registry.get_registry, id_type=db_type, risk_level=risk, limit=5000)
     
-    # Apply date filtering
+    # Apply date filtering: one chained comparison per entry on the
+    # YYYY-MM-DD prefix of firstSeen (open bounds can never exclude)
     if date_from or date_to:
-        filtered = []
-        for e in entries:
-            first_seen = e.get("firstSeen", "")
-            if isinstance(first_seen, str):
-                date_part = first_seen[:10]
-            else:
-                date_part = ""
-            if date_from and date_part < date_from:
-                continue
-            if date_to and date_part > date_to:
-                continue
-            filtered.append(e)
-        entries = filtered
+        lo = date_from or ""
+        hi = date_to or "\uffff"
+        entries = [
+            e for e in entries
+            if lo <= (fs[:10] if isinstance(fs := e.get("firstSeen", ""), str) else "") <= hi
+        ]
+    
+    # Styling and zipping up to 5000 rows is CPU work: keep it off the loop
+    content = await asyncio.to_thread(_registry_workbook, entries)
+    
+    filename = f"trusthoneypot_intelligence_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.xlsx"
+    return Response(
+        content=content,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+_EXPORT_HEADERS = ("Identifier", "Type", "Risk Level", "Confidence %", "Occurrences", "First Seen", "Last Seen", "Sessions")
+
+
+def _registry_workbook(entries: list) -> bytes:
+    """
+    Render registry entries as a styled .xlsx.
     
-    wb = Workbook()
-    ws = wb.active
-    assert ws is not None, "Workbook must have an active sheet"
-    ws.title = "Intelligence Registry"
+    Write-only mode streams rows into the zip instead of keeping a Cell
+    object per value. Column widths must be set before the first row, so
+    they come from one pass over the plain row values.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Intelligence Registry")
     
     # Header style
     header_font = Font(bold=True, color="FFFFFF", size=11)
@@ -1022,14 +1139,7 @@ async def export_intelligence_excel(
         left=Side(style="thin"), right=Side(style="thin"),
         top=Side(style="thin"), bottom=Side(style="thin"),
     )
-    
-    headers = ["Identifier", "Type", "Risk Level", "Confidence %", "Occurrences", "First Seen", "Last Seen", "Sessions"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = thin_border
+    center = Alignment(horizontal="center")
     
     # Risk color fills
     risk_fills = {
@@ -1038,39 +1148,55 @@ async def export_intelligence_excel(
         "medium": PatternFill("solid", fgColor="FFFACC"),
         "low": PatternFill("solid", fgColor="CCFFCC"),
     }
+    no_fill = PatternFill()
     
-    for row_idx, entry in enumerate(entries, 2):
-        ws.cell(row=row_idx, column=1, value=entry.get("masked", entry.get("value", ""))).border = thin_border
-        ws.cell(row=row_idx, column=2, value=entry.get("type", "")).border = thin_border
-        risk_cell = ws.cell(row=row_idx, column=3, value=(entry.get("riskLevel", "")).upper())
-        risk_cell.border = thin_border
-        risk_cell.fill = risk_fills.get(entry.get("riskLevel", ""), PatternFill())
-        conf_cell = ws.cell(row=row_idx, column=4, value=round(entry.get("confidence", 0) * 100, 1))
-        conf_cell.border = thin_border
-        conf_cell.alignment = Alignment(horizontal="center")
-        occ_cell = ws.cell(row=row_idx, column=5, value=entry.get("occurrences", 0))
-        occ_cell.border = thin_border
-        occ_cell.alignment = Alignment(horizontal="center")
-        ws.cell(row=row_idx, column=6, value=str(entry.get("firstSeen", ""))[:19]).border = thin_border
-        ws.cell(row=row_idx, column=7, value=str(entry.get("lastSeen", ""))[:19]).border = thin_border
-        sessions = entry.get("sessions", [])
-        ws.cell(row=row_idx, column=8, value=", ".join(s[:8] for s in sessions)).border = thin_border
+    rows = []
+    widths = [len(h) for h in _EXPORT_HEADERS]
+    for entry in entries:
+        get = entry.get
+        risk = get("riskLevel", "")
+        values = (
+            get("masked", get("value", "")),
+            get("type", ""),
+            risk.upper(),
+            round(get("confidence", 0) * 100, 1),
+            get("occurrences", 0),
+            str(get("firstSeen", ""))[:19],
+            str(get("lastSeen", ""))[:19],
+            ", ".join(s[:8] for s in get("sessions", [])),
+        )
+        rows.append((risk, values))
+        for i, value in enumerate(values):
+            n = len(str(value or ""))
+            if n > widths[i]:
+                widths[i] = n
     
     # Auto-width
-    for col in ws.columns:
-        max_length = max(len(str(cell.value or "")) for cell in col)
-        ws.column_dimensions[col[0].column_letter].width = min(max_length + 4, 40)  # type: ignore[union-attr]
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = min(width + 4, 40)
+    
+    header = []
+    for title in _EXPORT_HEADERS:
+        cell = WriteOnlyCell(ws, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cell.border = thin_border
+        header.append(cell)
+    ws.append(header)
+    
+    for risk, values in rows:
+        cells = [WriteOnlyCell(ws, value=value) for value in values]
+        for cell in cells:
+            cell.border = thin_border
+        cells[2].fill = risk_fills.get(risk, no_fill)
+        cells[3].alignment = center
+        cells[4].alignment = center
+        ws.append(cells)
     
     output = io.BytesIO()
     wb.save(output)
-    output.seek(0)
-    
-    filename = f"trusthoneypot_intelligence_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.xlsx"
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
+    return output.getvalue()
 
 
 @app.post("/intelligence/backfill")
@@ -1082,45 +1208,45 @@ async def backfill_intelligence(api_key: str = Depends(verify_api_key)):
     if not db_service.enabled:
         raise HTTPException(status_code=503, detail="Database not available")
     
-    summaries = db_service.get_session_summaries(limit=500)
-    backfilled = 0
-    for s in summaries:
+    backfilled = await asyncio.to_thread(_backfill_from_summaries)
+    response_cache.invalidate()  # registry and pattern views changed wholesale
+    logger.info("intelligence_backfill  sessions=%d", backfilled)
+    return {"backfilled": backfilled, "message": f"Processed {backfilled} sessions"}
+
+
+def _backfill_from_summaries() -> int:
+    """Re-register identifiers and patterns for stored sessions (blocking DB work).
+
+    Builds one op list per collection and writes each with a single bulk_write.
+    """
+    intel_items = []
+    pattern_items = []
+    for s in db_service.get_session_summaries(limit=500):
         intel = s.get("intelligence", {})
         if not intel:
             continue
         session_id = s.get("sessionId", "")
         risk_level = s.get("riskLevel", "minimal")
         confidence = s.get("confidence", 0.0)
-        scam_type = s.get("scamType", "unknown")
-        tactics = s.get("tactics", [])
         
-        # Register identifiers
-        intel_registry.register_session_intelligence(
-            session_id=session_id,
-            intelligence=intel,
-            risk_level=risk_level,
-            confidence=confidence,
-        )
-        # Register pattern
-        all_ids = (
-            intel.get("upiIds", []) +
-            intel.get("phoneNumbers", []) +
-            intel.get("bankAccounts", []) +
-            intel.get("phishingLinks", []) +
-            intel.get("emails", [])
-        )
-        pattern_engine.register_pattern(
-            session_id=session_id,
-            scam_type=scam_type,
-            tactics=tactics,
-            identifiers=all_ids,
-            risk_level=risk_level,
-            confidence=confidence,
-        )
-        backfilled += 1
+        intel_items.append({
+            "session_id": session_id,
+            "intelligence": intel,
+            "risk_level": risk_level,
+            "confidence": confidence,
+        })
+        pattern_items.append({
+            "session_id": session_id,
+            "scam_type": s.get("scamType", "unknown"),
+            "tactics": s.get("tactics", []),
+            "identifiers": chain.from_iterable(intel.get(f, ()) for f in PATTERN_IDENTIFIER_FIELDS),
+            "risk_level": risk_level,
+            "confidence": confidence,
+        })
     
-    logger.info("intelligence_backfill  sessions=%d", backfilled)
-    return {"backfilled": backfilled, "message": f"Processed {backfilled} sessions"}
+    intel_registry.register_session_intelligence_bulk(intel_items)
+    pattern_engine.register_pattern_bulk(pattern_items)
+    return len(pattern_items)
 
 
 if __name__ == "__main__":
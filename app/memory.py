@@ -1,12 +1,33 @@
 """
 In-memory session storage for multi-turn conversations
 """
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Deque, List, Dict, Optional, Tuple
 
 # Stale sessions older than this are eligible for cleanup
 SESSION_TTL_HOURS = 24
 MAX_SESSIONS = 1000
+# Sessions whose final callback went out, remembered past eviction
+MAX_SENT_RECORDS = 100 * MAX_SESSIONS
+
+
+@dataclass(slots=True)
+class SessionState:
+    """Per-session server state (fixed fields: no per-key dict hashing)."""
+    start_time: float = field(default_factory=time.monotonic)  # monotonic seconds
+    messages: List[dict] = field(default_factory=list)
+    message_count: int = 0
+    scam_confirmed: bool = False
+    callback_sent: bool = False
+    agent_response: Optional[str] = None
+    # v2.2: Conversation stage engine
+    session_state: str = "GREETING"  # GREETING → RAPPORT_BUILDING → MONITORING → ESCALATION
+    cumulative_risk_score: int = 0   # Cumulative risk score from detector
+    last_intent: Optional[str] = None          # Last classified intent
+    last_extracted_hash: Optional[bytes] = None  # Digest of last text run through the extractor
 
 
 class SessionMemory:
@@ -23,8 +44,20 @@ class SessionMemory:
     """
     
     def __init__(self):
-        # Dictionary to store all ongoing conversations
-        self.sessions: Dict[str, dict] = {}
+        # All ongoing conversations, least recently active first
+        self.sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        # Ready-to-serve /sessions rows, kept in sync on every write
+        self.session_view: Dict[str, dict] = {}
+        # (start_time, session_id) in creation order, so the stale sweep
+        # pops only the expired front. Entries of sessions already evicted
+        # are skipped when they reach the front.
+        self._by_start: Deque[Tuple[float, str]] = deque()
+        # Callback-sent flags outlive eviction, so a session that comes back
+        # after being dropped does not POST its final callback again
+        self._callback_sent: "OrderedDict[str, None]" = OrderedDict()
+        # Called with the session ID on eviction, to clear the other
+        # per-session stores (detector, extractor, agent)
+        self.on_evict: Optional[Callable[[str], None]] = None
     
     def create_session(self, session_id: str) -> None:
         """
@@ -33,19 +66,26 @@ class SessionMemory:
         Args:
             session_id: Unique session identifier
         """
-        if session_id not in self.sessions:
-            self.sessions[session_id] = {
-                "startTime": datetime.utcnow(),
-                "messages": [],
-                "messageCount": 0,
-                "scamConfirmed": False,
-                "callbackSent": False,
-                "agentResponse": None,
-                # v2.2: Conversation stage engine
-                "sessionState": "GREETING",  # GREETING → RAPPORT_BUILDING → MONITORING → ESCALATION
-                "cumulativeRiskScore": 0,     # Cumulative risk score from detector
-                "lastIntent": None,           # Last classified intent
-            }
+        if session_id in self.sessions:
+            self.sessions.move_to_end(session_id)  # keep LRU order current
+            return
+        sent = session_id in self._callback_sent
+        state = self.sessions[session_id] = SessionState(callback_sent=sent)
+        self._by_start.append((state.start_time, session_id))
+        self.session_view[session_id] = {
+            "session_id": session_id,
+            "scam_confirmed": False,
+            "message_count": 0,
+            "callback_sent": sent,
+            "risk_level": "minimal",
+            "scam_type": "unknown",
+            "confidence": 0.0,
+            "intelligence_counts": {},
+            "active": True,
+        }
+        if len(self.sessions) > MAX_SESSIONS:
+            # Hard cap between sweeps: evict the least recently active session
+            self._drop(next(iter(self.sessions)))
     
     def add_message(self, session_id: str, sender: str, text: str) -> None:
         """
@@ -57,21 +97,23 @@ class SessionMemory:
             text: Message text
         """
         self.create_session(session_id)
+        state = self.sessions[session_id]
         
-        self.sessions[session_id]["messages"].append({
+        state.messages.append({
             "sender": sender,
             "text": text,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": datetime.now(timezone.utc).isoformat()
         })
         
         if sender == "scammer":
-            self.sessions[session_id]["messageCount"] += 1
+            state.message_count += 1
+            self.session_view[session_id]["message_count"] = state.message_count
     
     def get_message_count(self, session_id: str) -> int:
         """Get total scammer messages for session"""
         if session_id not in self.sessions:
             return 0
-        return self.sessions[session_id]["messageCount"]
+        return self.sessions[session_id].message_count
     
     def get_duration(self, session_id: str) -> int:
         """
@@ -86,42 +128,53 @@ class SessionMemory:
         if session_id not in self.sessions:
             return 0
         
-        start_time = self.sessions[session_id]["startTime"]
-        duration = (datetime.utcnow() - start_time).total_seconds()
-        return int(duration)
+        return int(time.monotonic() - self.sessions[session_id].start_time)
     
     def mark_scam_confirmed(self, session_id: str) -> None:
         """Mark that scam has been confirmed for session"""
         if session_id in self.sessions:
-            self.sessions[session_id]["scamConfirmed"] = True
+            self.sessions[session_id].scam_confirmed = True
+            self.session_view[session_id]["scam_confirmed"] = True
     
     def is_scam_confirmed(self, session_id: str) -> bool:
         """Check if scam is confirmed for session"""
         if session_id not in self.sessions:
             return False
-        return self.sessions[session_id]["scamConfirmed"]
+        return self.sessions[session_id].scam_confirmed
     
     def mark_callback_sent(self, session_id: str) -> None:
         """Mark that final callback has been sent"""
+        sent = self._callback_sent
+        sent[session_id] = None
+        sent.move_to_end(session_id)
+        if len(sent) > MAX_SENT_RECORDS:
+            sent.popitem(last=False)
         if session_id in self.sessions:
-            self.sessions[session_id]["callbackSent"] = True
+            self.sessions[session_id].callback_sent = True
+            self.session_view[session_id]["callback_sent"] = True
     
     def is_callback_sent(self, session_id: str) -> bool:
-        """Check if callback has been sent for session"""
-        if session_id not in self.sessions:
-            return False
-        return self.sessions[session_id]["callbackSent"]
+        """Check if callback has been sent for session (evicted sessions too)"""
+        return session_id in self._callback_sent
     
     def set_agent_response(self, session_id: str, response: str) -> None:
         """Store agent response for current turn"""
         if session_id in self.sessions:
-            self.sessions[session_id]["agentResponse"] = response
+            self.sessions[session_id].agent_response = response
+    
+    def update_detection_view(self, session_id: str, risk_level: str, scam_type: str, confidence: float) -> None:
+        """Refresh the detector fields of the session's /sessions row."""
+        view = self.session_view.get(session_id)
+        if view is not None:
+            view["risk_level"] = risk_level
+            view["scam_type"] = scam_type
+            view["confidence"] = confidence
     
     def get_agent_response(self, session_id: str) -> Optional[str]:
         """Get agent response for current turn"""
         if session_id not in self.sessions:
             return None
-        return self.sessions[session_id].get("agentResponse")
+        return self.sessions[session_id].agent_response
     
     def session_exists(self, session_id: str) -> bool:
         """Check if session exists"""
@@ -132,58 +185,75 @@ class SessionMemory:
         """Get conversation stage state for session."""
         if session_id not in self.sessions:
             return "GREETING"
-        return self.sessions[session_id].get("sessionState", "GREETING")
+        return self.sessions[session_id].session_state
     
     def set_session_state(self, session_id: str, state: str) -> None:
         """Update conversation stage state."""
         if session_id in self.sessions:
-            self.sessions[session_id]["sessionState"] = state
+            self.sessions[session_id].session_state = state
     
     def update_risk_score(self, session_id: str, score: int) -> None:
         """Update cumulative risk score for session."""
         if session_id in self.sessions:
-            self.sessions[session_id]["cumulativeRiskScore"] = score
+            self.sessions[session_id].cumulative_risk_score = score
     
     def get_risk_score(self, session_id: str) -> int:
         """Get cumulative risk score for session."""
         if session_id not in self.sessions:
             return 0
-        return self.sessions[session_id].get("cumulativeRiskScore", 0)
+        return self.sessions[session_id].cumulative_risk_score
     
     def set_last_intent(self, session_id: str, intent: str) -> None:
         """Store last classified intent for session."""
         if session_id in self.sessions:
-            self.sessions[session_id]["lastIntent"] = intent
+            self.sessions[session_id].last_intent = intent
     
     def get_last_intent(self, session_id: str) -> Optional[str]:
         """Get last classified intent for session."""
         if session_id not in self.sessions:
             return None
-        return self.sessions[session_id].get("lastIntent")
+        return self.sessions[session_id].last_intent
+    
+    def last_extracted_hash(self, session_id: str) -> Optional[bytes]:
+        """Get digest of the last message text run through the extractor."""
+        if session_id not in self.sessions:
+            return None
+        return self.sessions[session_id].last_extracted_hash
+    
+    def set_last_extracted_hash(self, session_id: str, digest: bytes) -> None:
+        """Remember digest of the last message text run through the extractor."""
+        if session_id in self.sessions:
+            self.sessions[session_id].last_extracted_hash = digest
     
     def cleanup_stale_sessions(self) -> int:
         """Remove sessions older than SESSION_TTL_HOURS. Returns count removed."""
-        cutoff = datetime.utcnow() - timedelta(hours=SESSION_TTL_HOURS)
-        stale = [
-            sid for sid, data in self.sessions.items()
-            if data["startTime"] < cutoff
-        ]
-        for sid in stale:
-            del self.sessions[sid]
-        return len(stale)
+        cutoff = time.monotonic() - SESSION_TTL_HOURS * 3600
+        by_start = self._by_start
+        removed = 0
+        while by_start and by_start[0][0] < cutoff:
+            start_time, sid = by_start.popleft()
+            state = self.sessions.get(sid)
+            # Skip sessions already evicted (or evicted and started again)
+            if state is not None and state.start_time == start_time:
+                self._drop(sid)
+                removed += 1
+        if len(by_start) > 2 * MAX_SESSIONS:
+            # Mostly evicted sessions' entries: rebuild from the live ones
+            self._by_start = deque(sorted(
+                (state.start_time, sid) for sid, state in self.sessions.items()
+            ))
+        return removed
     
     def enforce_limit(self) -> None:
-        """If over MAX_SESSIONS, drop the oldest sessions."""
-        if len(self.sessions) <= MAX_SESSIONS:
-            return
-        # Sort by startTime, drop oldest
-        sorted_ids = sorted(
-            self.sessions.keys(),
-            key=lambda sid: self.sessions[sid]["startTime"]
-        )
-        to_remove = sorted_ids[: len(self.sessions) - MAX_SESSIONS]
-        for sid in to_remove:
-            del self.sessions[sid]
+        """If over MAX_SESSIONS, drop the least recently active sessions."""
+        while len(self.sessions) > MAX_SESSIONS:
+            self._drop(next(iter(self.sessions)))
+    
+    def _drop(self, session_id: str) -> None:
+        del self.sessions[session_id]
+        self.session_view.pop(session_id, None)
+        if self.on_evict is not None:
+            self.on_evict(session_id)
 
 
 # Global memory instance
@@ -2,7 +2,7 @@
 Data models for the Honeypot API.
 Using Pydantic for validation - it catches bad data before it causes problems.
 """
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter
 from pydantic import ConfigDict
 from typing import List, Optional, Union
 
@@ -19,15 +19,14 @@ class Message(BaseModel):
     model_config = ConfigDict(extra="ignore")  # ignore unexpected fields
     sender: Optional[str] = Field(default="scammer")  # default for leniency
     text: str
-    timestamp: Optional[Union[str, int]] = None  # Accept both string and int
-    
-    @field_validator('timestamp', mode='before')
-    @classmethod
-    def convert_timestamp(cls, v):
-        """Convert numeric timestamps to string for consistency."""
-        if isinstance(v, (int, float)):
-            return str(int(v))
-        return v
+    # Accept both string and number; numbers become str inside pydantic-core,
+    # with no Python validator call per history item
+    timestamp: Optional[str] = Field(default=None, coerce_numbers_to_str=True)
+
+
+# Validates a whole list of raw message dicts in one pydantic-core call
+# (schema built once here, not per use)
+MessageHistory = TypeAdapter(List[Message])
 
 
 class Metadata(BaseModel):
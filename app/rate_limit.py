@@ -0,0 +1,159 @@
+"""
+Per-IP rate limiting.
+
+Two backends:
+- Redis (when REDIS_URL is set and redis is installed): fixed one-minute
+  window keyed rl:{ip}:{minute}, INCR + EXPIRE pipelined in one
+  round-trip, shared by every worker/instance.
+- In-memory (default, and fallback while Redis errors): token bucket per IP
+  with lazy refill, kept in a bounded LRU (RateLimitStore). Bucket levels
+  are integers on the monotonic_ns clock: one request costs WINDOW_NS
+  units and every elapsed nanosecond refills `limit` units.
+"""
+import os
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# redis for limits shared across workers
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+RATE_LIMIT = int(os.getenv("RATE_LIMIT_PER_MINUTE", "60"))
+WINDOW_SECONDS = 60
+WINDOW_NS = WINDOW_SECONDS * 1_000_000_000
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of one rate-limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: int  # seconds until a request would be allowed (0 if allowed)
+
+
+class RateLimitStore:
+    """
+    Bounded LRU of ip -> (level, last_refill_ns).
+    
+    Entries are kept in least-recently-seen order, so a sweep only walks
+    the expired prefix, and an IP flood evicts the oldest entries rather
+    than growing memory. An entry idle for a full window has refilled
+    completely, so dropping it is indistinguishable from keeping it.
+    """
+
+    MAX_IPS = 50_000
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, ip: str) -> Optional[tuple]:
+        return self._entries.get(ip)
+
+    def put(self, ip: str, level: int, now_ns: int) -> None:
+        self._entries[ip] = (level, now_ns)
+        self._entries.move_to_end(ip)
+        if len(self._entries) > self.MAX_IPS:
+            self._entries.popitem(last=False)
+
+    def cleanup_expired(self, now_ns: int) -> int:
+        """Drop entries idle for a full window. O(expired), not O(N)."""
+        removed = 0
+        while self._entries:
+            _, last_ns = next(iter(self._entries.values()))
+            if now_ns - last_ns < WINDOW_NS:
+                break
+            self._entries.popitem(last=False)
+            removed += 1
+        return removed
+
+
+class RateLimiter:
+    """Per-IP limiter: Redis when configured, in-memory token bucket otherwise."""
+
+    # After a Redis failure, skip it for this long instead of paying the
+    # socket timeout on every request while it is down
+    REDIS_RETRY_SECONDS = 30
+
+    def __init__(self, limit: int = RATE_LIMIT):
+        self.limit = limit
+        self.capacity = limit * WINDOW_NS  # full bucket, in integer units
+        self.store = RateLimitStore()
+        self.redis_url = os.getenv("REDIS_URL", "")
+        self._redis = None
+        self._redis_retry_ns = 0  # monotonic_ns before which Redis is skipped
+        if self.redis_url and REDIS_AVAILABLE:
+            self._redis = aioredis.from_url(self.redis_url, socket_timeout=0.5)
+        elif self.redis_url:
+            logger.warning("REDIS_URL set but redis not installed; using in-memory rate limiting.")
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    async def hit(self, client_ip: str) -> RateLimitResult:
+        """Count one request from client_ip and report whether it is allowed."""
+        if self._redis is not None and time.monotonic_ns() >= self._redis_retry_ns:
+            try:
+                return await self._hit_redis(client_ip)
+            except Exception as e:
+                self._redis_retry_ns = time.monotonic_ns() + self.REDIS_RETRY_SECONDS * 1_000_000_000
+                logger.warning(
+                    f"Redis rate limit failed, using in-memory for {self.REDIS_RETRY_SECONDS}s: {e}"
+                )
+        return self._hit_memory(client_ip)
+
+    async def _hit_redis(self, client_ip: str) -> RateLimitResult:
+        # One key per IP per wall-clock minute; INCR + EXPIRE in a single
+        # pipelined round-trip (EXPIRE covers the minute plus slack).
+        now = time.time()
+        key = f"rl:{client_ip}:{int(now // WINDOW_SECONDS)}"
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.incr(key)
+        pipe.expire(key, WINDOW_SECONDS * 2)
+        count, _ = await pipe.execute()
+        if count > self.limit:
+            retry_after = WINDOW_SECONDS - int(now % WINDOW_SECONDS)
+            return RateLimitResult(False, self.limit, 0, retry_after)
+        return RateLimitResult(True, self.limit, self.limit - count, 0)
+
+    def _hit_memory(self, client_ip: str) -> RateLimitResult:
+        now_ns = time.monotonic_ns()
+        entry = self.store.get(client_ip)
+        if entry is None:
+            level = self.capacity
+        else:
+            level, last_ns = entry
+            level = min(self.capacity, level + (now_ns - last_ns) * self.limit)
+
+        if level < WINDOW_NS:
+            self.store.put(client_ip, level, now_ns)
+            wait_ns = (WINDOW_NS - level) // self.limit
+            return RateLimitResult(False, self.limit, 0, wait_ns // 1_000_000_000 + 1)
+        level -= WINDOW_NS
+        self.store.put(client_ip, level, now_ns)
+        return RateLimitResult(True, self.limit, level // WINDOW_NS, 0)
+
+    def cleanup_expired(self) -> int:
+        """Sweep idle in-memory buckets (run periodically from the lifespan)."""
+        return self.store.cleanup_expired(time.monotonic_ns())
+
+    async def close(self):
+        """Close the Redis connection pool on shutdown."""
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+# Singleton instance
+rate_limiter = RateLimiter()
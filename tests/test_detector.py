@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from detector import ScamDetector  # noqa: E402
+
+# Every layer-1 keyword, plus filler, case/length edge cases ("İ" grows
+# when lowered), links, numbers and the bulk separator's neighbours
+VOCAB = sorted(
+    {keyword for keywords, _ in ScamDetector.KEYWORD_LAYERS for keyword in keywords}
+    | {"hello", "sir", "ok", "URGENT", "Jaldi", "İİ", "rs 500", "9876543210",
+       "http://bit.ly/x", "raj@okaxis", "!!", "-", "\n"}
+)
+
+
+def _random_texts(rng: random.Random) -> list:
+    return [
+        " ".join(rng.choice(VOCAB) for _ in range(rng.randint(0, 8)))
+        for _ in range(rng.randint(1, 12))
+    ]
+
+
+def _state(detector: ScamDetector, session_id: str) -> tuple:
+    return (
+        detector.session_scores.get(session_id),
+        detector.session_details.get(session_id),
+        detector.session_categories.get(session_id),
+        detector.session_message_count.get(session_id),
+        detector.session_intents.get(session_id),
+    )
+
+
+def test_bulk_score_matches_per_message_scoring():
+    rng = random.Random(1234)
+    for _ in range(150):
+        texts = _random_texts(rng)
+        seen = rng.randint(0, 2)  # some sessions already have scored turns
+        single, bulk = ScamDetector(), ScamDetector()
+        for text in texts[:seen]:
+            single.calculate_risk_score(text, "s")
+            bulk.calculate_risk_score(text, "s")
+
+        expected = single.get_session_score("s"), False
+        for text in texts[seen:]:
+            expected = single.calculate_risk_score(text, "s")
+
+        assert bulk.calculate_risk_score_bulk(texts[seen:], "s") == expected, texts
+        assert _state(bulk, "s") == _state(single, "s"), texts
+
+
+def test_bulk_score_of_no_texts_keeps_session_score():
+    detector = ScamDetector()
+    detector.calculate_risk_score("urgent: your account will be blocked", "s")
+
+    assert detector.calculate_risk_score_bulk([], "s") == (detector.get_session_score("s"), False)
@@ -0,0 +1,18 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from extractor import IntelligenceExtractor  # noqa: E402
+
+
+def test_extract_bulk_matches_per_message_extraction():
+    texts = ["pay to raj@okaxis", "contact ab@xyzabc please"]
+
+    bulk = IntelligenceExtractor().extract_bulk(texts, "bulk")
+
+    single = IntelligenceExtractor()
+    for text in texts:
+        expected = single.extract(text, "single")
+
+    assert sorted(bulk["upiIds"]) == sorted(expected["upiIds"]) == ["raj@okaxis"]
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from inflight import InFlight  # noqa: E402
+
+
+class Counter:
+    """Slow call that counts how often it really runs."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, value="reply"):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return value
+
+
+def test_identical_concurrent_calls_share_one_call():
+    async def main():
+        inflight, call = InFlight(), Counter()
+        results = await asyncio.gather(*(inflight.run("k", call) for _ in range(5)))
+        return results, call.calls, len(inflight)
+
+    assert asyncio.run(main()) == (["reply"] * 5, 1, 0)
+
+
+def test_distinct_keys_and_later_calls_run_separately():
+    async def main():
+        inflight, call = InFlight(), Counter()
+        results = await asyncio.gather(
+            inflight.run("a", lambda: call("a")),
+            inflight.run("b", lambda: call("b")),
+        )
+        await inflight.run("a", lambda: call("a"))  # finished calls are not reused
+        return results, call.calls
+
+    assert asyncio.run(main()) == (["a", "b"], 3)
+
+
+def test_failure_reaches_every_waiter():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("llm down")
+
+    async def main():
+        inflight = InFlight()
+        results = await asyncio.gather(
+            inflight.run("k", fail), inflight.run("k", fail), return_exceptions=True
+        )
+        return results, len(inflight)
+
+    results, pending = asyncio.run(main())
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert pending == 0
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    async def main():
+        inflight, call = InFlight(), Counter()
+        first = asyncio.ensure_future(inflight.run("k", call))
+        second = asyncio.ensure_future(inflight.run("k", call))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, call.calls
+
+    assert asyncio.run(main()) == ("reply", 1)
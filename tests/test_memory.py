@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import memory as memory_module  # noqa: E402
+from memory import SessionMemory  # noqa: E402
+
+
+def test_evicted_session_does_not_resend(monkeypatch):
+    monkeypatch.setattr(memory_module, "MAX_SESSIONS", 2)
+    mem = SessionMemory()
+    evicted = []
+    mem.on_evict = evicted.append
+
+    mem.create_session("a")
+    mem.mark_scam_confirmed("a")
+    mem.mark_callback_sent("a")
+    mem.create_session("b")
+    mem.create_session("c")  # over the cap: "a" is least recently active
+
+    assert evicted == ["a"]
+    assert not mem.session_exists("a")
+    assert mem.is_callback_sent("a")
+
+    mem.create_session("a")  # the scammer comes back
+    assert mem.is_callback_sent("a")
+    assert mem.session_view["a"]["callback_sent"] is True
+
+
+def test_active_session_is_not_the_one_evicted(monkeypatch):
+    monkeypatch.setattr(memory_module, "MAX_SESSIONS", 2)
+    mem = SessionMemory()
+    mem.create_session("a")
+    mem.create_session("b")
+    mem.add_message("a", "scammer", "hello")  # "a" active again: "b" is LRU
+    mem.create_session("c")
+
+    assert list(mem.sessions) == ["a", "c"]
+    assert set(mem.session_view) == {"a", "c"}
+
+
+def test_enforce_limit_drops_least_recent(monkeypatch):
+    mem = SessionMemory()
+    for sid in "abcd":
+        mem.create_session(sid)
+    monkeypatch.setattr(memory_module, "MAX_SESSIONS", 2)
+    evicted = []
+    mem.on_evict = evicted.append
+
+    mem.enforce_limit()
+
+    assert evicted == ["a", "b"]
+    assert list(mem.sessions) == ["c", "d"]
+
+
+def test_stale_sweep_uses_start_time(monkeypatch):
+    mem = SessionMemory()
+    evicted = []
+    mem.on_evict = evicted.append
+    mem.create_session("old")
+    mem.create_session("restarted")
+    mem._drop("restarted")  # its start-time entry is now stale
+    time.sleep(0.2)
+    mem.create_session("restarted")  # same ID, new start time
+    mem.create_session("new")
+    mem.add_message("old", "scammer", "still here")  # activity does not extend the TTL
+    monkeypatch.setattr(memory_module, "SESSION_TTL_HOURS", 0.1 / 3600)  # 0.1 s
+
+    assert mem.cleanup_stale_sessions() == 1
+    assert evicted == ["restarted", "old"]
+    assert set(mem.sessions) == {"restarted", "new"}
+    assert mem.cleanup_stale_sessions() == 0
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import rate_limit  # noqa: E402
+from rate_limit import WINDOW_NS, RateLimiter, RateLimitStore  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manual monotonic_ns clock for the rate_limit module."""
+    now = SimpleNamespace(ns=10 * WINDOW_NS)
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic_ns=lambda: now.ns, time=time.time))
+    return now
+
+
+@pytest.fixture
+def limiter(monkeypatch, clock):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    return RateLimiter(limit=3)
+
+
+def test_store_evicts_least_recently_seen_ip(monkeypatch):
+    monkeypatch.setattr(RateLimitStore, "MAX_IPS", 2)
+    store = RateLimitStore()
+    store.put("a", 0, 0)
+    store.put("b", 0, 0)
+    store.put("a", 0, 1)  # seen again: "b" is now the oldest
+    store.put("c", 0, 2)
+
+    assert len(store) == 2
+    assert store.get("b") is None
+    assert store.get("a") == (0, 1)
+
+
+def test_store_sweep_drops_only_idle_prefix():
+    store = RateLimitStore()
+    store.put("old", 0, 0)
+    store.put("fresh", 0, WINDOW_NS)
+    store.put("older", 0, 0)  # out of time order: sweep stops at "fresh"
+
+    assert store.cleanup_expired(WINDOW_NS + 1) == 1
+    assert store.get("old") is None
+    assert store.get("fresh") is not None
+    assert store.get("older") is not None
+
+
+def test_memory_bucket_allows_limit_then_refills(limiter, clock):
+    results = [limiter._hit_memory("1.2.3.4") for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0]
+    assert results[3].retry_after == 21  # 20s to refill one request, rounded up
+
+    clock.ns += WINDOW_NS // 3  # one request's worth of refill
+    assert limiter._hit_memory("1.2.3.4").allowed
+    assert not limiter._hit_memory("1.2.3.4").allowed
+    assert limiter._hit_memory("5.6.7.8").allowed  # buckets are per IP
+
+
+def test_idle_buckets_are_swept(limiter, clock):
+    limiter._hit_memory("1.2.3.4")
+    clock.ns += WINDOW_NS
+
+    assert limiter.cleanup_expired() == 1
+    assert len(limiter.store) == 0
+
+
+def test_hit_uses_memory_without_redis(limiter):
+    assert limiter.backend == "memory"
+    result = asyncio.run(limiter.hit("1.2.3.4"))
+    assert result.allowed and result.limit == 3 and result.remaining == 2